@@ -1,6 +1,204 @@
-from django.contrib import admin
-from .models import Task
+import json
 
-admin.site.register(Task)
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.forms import UserChangeForm, UserCreationForm
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
 
+from .cache import invalidate_user_tasks
+from .deletion import schedule_deletion
+from .models import Task, User, UserDeletion
 
+AFTER_VAR = 'after'
+EXACT_COUNT_BELOW = 10000
+
+
+def estimated_count(queryset):
+    """
+    (count, is_estimate). On PostgreSQL the count is the planner's estimate (table statistics,
+    no scan) unless that is below EXACT_COUNT_BELOW rows, where counting is cheap.
+    """
+    queryset = queryset.order_by()
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count(), False
+    estimate = json.loads(queryset.explain(format='json'))[0]['Plan']['Plan Rows']
+    if estimate < EXACT_COUNT_BELOW:
+        return queryset.count(), False
+    return int(estimate), True
+
+
+class EstimatedCountPaginator(Paginator):
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, self.is_estimate = estimated_count(self.object_list)
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Pages with ``?after=<value of the last row's keyset_field>`` instead of OFFSET, so every
+    page is one index range scan. The list is always in keyset_field order (sortable_by = ()).
+    """
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(AFTER_VAR, None)
+        return params
+
+    def get_results(self, request):
+        field = self.model_admin.keyset_field
+        name = field.lstrip('-')
+        queryset = self.queryset
+        after = request.GET.get(AFTER_VAR)
+        if after is not None:
+            try:
+                after = self.lookup_opts.get_field(name).to_python(after)
+            except ValidationError:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(**{f'{name}__lt' if field.startswith('-') else f'{name}__gt': after})
+        rows = list(queryset[:self.list_per_page + 1])
+        has_next = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_next or after is not None
+        self.next_page_url = self.get_query_string({AFTER_VAR: getattr(rows[-1], name)}) if has_next else None
+        self.first_page_url = self.get_query_string(remove=[AFTER_VAR]) if after is not None else None
+
+
+class ScalableAdminMixin:
+    """Changelist without COUNT(*) or OFFSET: estimated totals and keyset pages (see KeysetChangeList)."""
+    keyset_field = '-id'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    sortable_by = ()
+
+    def get_ordering(self, request):
+        return (self.keyset_field,)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+def set_status_action(value):
+    def set_status(modeladmin, request, queryset):
+        # One UPDATE for the whole selection (including "select all"); no per-object save().
+        with transaction.atomic(using=queryset.db):
+            user_ids = list(queryset.order_by().values_list('user_id', flat=True).distinct())
+            updated = queryset.order_by().update(status=value, updated_at=timezone.now())
+            for user_id in user_ids:
+                invalidate_user_tasks(user_id)
+        modeladmin.message_user(request, f'{updated} task(s) set to "{value}".', messages.SUCCESS)
+    set_status.__name__ = f'set_status_{value.lower().replace(" ", "_")}'
+    return admin.action(description=f'Set status to "{value}"')(set_status)
+
+
+@admin.register(Task)
+class TaskAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'title', 'status', 'user', 'created_at', 'updated_at')
+    list_select_related = ('user',)
+    list_filter = ('status',)  # choices: no query to build the filter
+    search_fields = ('user__username__exact',)
+    search_help_text = 'Task id or exact username'
+    autocomplete_fields = ('user',)
+    readonly_fields = ('created_at', 'updated_at')
+    actions = [set_status_action(value) for value, _ in Task.STATUS_CHOICES] + ['delete_tasks']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Both lookups hit an index: the primary key, or the unique username joined to user_id.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(pk=int(search_term)), False
+        return queryset.filter(user__username=search_term), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # The built-in action loads every selected task (post_delete is connected) and lists them all.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Delete selected tasks', permissions=['delete'])
+    def delete_tasks(self, request, queryset):
+        # One DELETE; the triggers on tasks_task still update stats and write tombstones.
+        queryset = queryset.order_by()
+        with transaction.atomic(using=queryset.db):
+            user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+            sql, params = queryset.values('pk').query.sql_with_params()
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(f'DELETE FROM tasks_task WHERE id IN ({sql})', params)
+                deleted = cursor.rowcount
+            for user_id in user_ids:
+                invalidate_user_tasks(user_id)
+        self.message_user(request, f'{deleted} task(s) deleted.', messages.SUCCESS)
+
+
+class TaskUserCreationForm(UserCreationForm):
+    class Meta(UserCreationForm.Meta):
+        model = User
+        fields = ('username', 'first_name')
+
+
+class TaskUserChangeForm(UserChangeForm):
+    class Meta(UserChangeForm.Meta):
+        model = User
+
+
+@admin.register(User)
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
+    keyset_field = 'username'
+    form = TaskUserChangeForm
+    add_form = TaskUserCreationForm
+    add_fieldsets = (
+        (None, {'classes': ('wide',), 'fields': ('username', 'first_name', 'password1', 'password2')}),
+    )
+    list_display = ('username', 'first_name', 'last_name', 'email', 'is_staff')
+    list_filter = ()  # BaseUserAdmin's filters are not indexed and would scan the table
+    # Prefix match on the unique username index; also used by the task form's user autocomplete.
+    search_fields = ('username__startswith',)
+    search_help_text = 'Username prefix'
+    actions = ['schedule_deletions']
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # The built-in action cascades every selected user's tasks in the request; schedule_deletions defers it.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Delete selected users in the background', permissions=['delete'])
+    def schedule_deletions(self, request, queryset):
+        # Deactivated now; manage.py process_deletions deletes their tasks in batches, then the users.
+        count = 0
+        for user in queryset:
+            schedule_deletion(user, using=queryset.db)
+            count += 1
+        self.message_user(request, f'{count} user(s) deactivated and queued for deletion.', messages.SUCCESS)
+
+
+@admin.register(UserDeletion)
+class UserDeletionAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'user_id', 'status', 'deleted_tasks', 'deleted_archived_tasks', 'batches', 'worker',
+                    'requested_at', 'heartbeat_at', 'finished_at')
+    list_filter = ('status',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
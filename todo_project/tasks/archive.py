@@ -0,0 +1,115 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .cache import invalidate_user_tasks
+from .models import ArchivedTask, Task
+
+COLUMNS = 'id, title, description, status, user_id, created_at, updated_at'
+RESTORE_COLUMNS = 'id, title, description, status, user_id, created_at, %s'
+ARCHIVE_BATCH_SIZE = 500
+
+
+def month_starts(start, end):
+    """First instant (UTC) of every month from ``start``'s month to ``end``'s month inclusive."""
+    month = datetime(start.year, start.month, 1, tzinfo=dt_timezone.utc)
+    while month <= end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def ensure_partitions(start, end, using='default'):
+    """Create the monthly partitions of tasks_archivedtask covering [start, end] (PostgreSQL only)."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for month in month_starts(start, end):
+            following = (month + timedelta(days=32)).replace(day=1)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS tasks_archivedtask_p{month:%Y%m} PARTITION OF tasks_archivedtask '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+            )
+
+
+class TaskArchiver:
+    """
+    Move Completed tasks last updated before ``cutoff`` from tasks_task to tasks_archivedtask.
+
+    Each batch is one short transaction (INSERT ... SELECT, then DELETE by id), so the command
+    can be stopped at any point and simply run again; rows locked by a concurrent request
+    are skipped and picked up by a later run.
+    """
+
+    def __init__(self, cutoff, batch_size=ARCHIVE_BATCH_SIZE, using='default'):
+        self.cutoff = cutoff
+        self.batch_size = batch_size
+        self.using = using
+        self.archived = self.batches = 0
+
+    def candidates(self):
+        return Task.objects.using(self.using).filter(status='Completed', updated_at__lt=self.cutoff)
+
+    def run(self, max_batches=None, pause=0.0):
+        bounds = self.candidates().aggregate(start=Min('created_at'), end=Max('created_at'))
+        if bounds['start'] is None:
+            return self.archived
+        ensure_partitions(bounds['start'], bounds['end'], using=self.using)
+        while max_batches is None or self.batches < max_batches:
+            if not self.archive_batch():
+                break
+            if pause:
+                time.sleep(pause)
+        return self.archived
+
+    def archive_batch(self):
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            rows = list(
+                self.candidates().order_by('id').select_for_update(skip_locked=True)
+                .values_list('id', 'user_id')[:self.batch_size]
+            )
+            if not rows:
+                return 0
+            ids = [pk for pk, _ in rows]
+            in_ids = ', '.join(['%s'] * len(ids))
+            archived_at = connection.ops.adapt_datetimefield_value(timezone.now())
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO tasks_archivedtask ({COLUMNS}, archived_at) '
+                    f'SELECT {COLUMNS}, %s FROM tasks_task WHERE id IN ({in_ids})',
+                    [archived_at, *ids],
+                )
+                cursor.execute(f'DELETE FROM tasks_task WHERE id IN ({in_ids})', ids)
+            for user_id in {user_id for _, user_id in rows}:
+                invalidate_user_tasks(user_id)
+        self.archived += len(ids)
+        self.batches += 1
+        return len(ids)
+
+
+def restore_tasks(user_id, ids=None, using='default'):
+    """Move a user's archived tasks (all, or those in ``ids``) back to tasks_task under their ids."""
+    archived = ArchivedTask.objects.using(using).filter(user_id=user_id)
+    if ids is not None:
+        archived = archived.filter(id__in=ids)
+    with transaction.atomic(using=using):
+        ids = list(archived.select_for_update().values_list('id', flat=True))
+        if not ids:
+            return 0
+        in_ids = ', '.join(['%s'] * len(ids))
+        connection = connections[using]
+        # A restore counts as an update: without a new updated_at the next archive_tasks run takes the task back.
+        restored_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO tasks_task ({COLUMNS}) SELECT {RESTORE_COLUMNS} FROM tasks_archivedtask '
+                f'WHERE id IN ({in_ids})',
+                [restored_at, *ids],
+            )
+        archived.filter(id__in=ids).delete()
+        invalidate_user_tasks(user_id)
+    return len(ids)
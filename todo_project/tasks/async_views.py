@@ -0,0 +1,252 @@
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.utils import translate_validation
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import AsyncJWTAuthentication
+from .changes import CursorExpired, change_events, check_cursor, encode_cursor, head_position
+from .events import hub
+from .filters import DEFAULT_ORDERING, TaskFilter
+from .instrumentation import timed
+from .models import Task
+from .routers import pin_to_primary
+from .readpath import task_encoder, task_values
+from .serializers import TaskSerializer
+from .throttling import TaskReadThrottle, TaskWriteThrottle
+
+
+class AsyncAPIError(Exception):
+    def __init__(self, detail, status_code, headers=None):
+        self.detail = detail
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskView(View):
+    """
+    Base for the async task endpoints (/api/async/tasks/...).
+
+    Mirrors TaskViewSet but runs natively under ASGI: JWT auth and every query use the
+    async ORM, so a request waiting on the database does not hold a worker thread.
+    """
+    authentication_class = AsyncJWTAuthentication
+    throttle_classes = (TaskReadThrottle, TaskWriteThrottle)  # and buckets shared with TaskViewSet
+    page_size = api_settings.PAGE_SIZE
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            self.user = request.user = await self.authenticate(request)
+            self.check_throttles(request)
+            if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+                pin_to_primary(self.user.pk)  # keep this user's TaskViewSet reads on the primary
+            return await super().dispatch(request, *args, **kwargs)
+        except AsyncAPIError as exc:
+            response = JsonResponse(exc.detail, status=exc.status_code, safe=False, headers=exc.headers)
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                response['WWW-Authenticate'] = self.authentication_class().authenticate_header(request)
+            return response
+
+    async def authenticate(self, request):
+        auth = self.authentication_class()
+        try:
+            with timed('auth'):
+                result = await auth.aauthenticate(request)
+        except APIException as exc:
+            raise AsyncAPIError(exc.detail, exc.status_code)
+        if result is None:
+            raise AsyncAPIError(
+                {'detail': 'Authentication credentials were not provided.'}, status.HTTP_401_UNAUTHORIZED
+            )
+        return result[0]
+
+    def check_throttles(self, request):
+        # In-process token buckets: no I/O, so they run inline.
+        waits = [throttle.wait() for throttle in (cls() for cls in self.throttle_classes)
+                 if not throttle.allow_request(request, self)]
+        if waits:
+            exc = Throttled(max(waits))
+            raise AsyncAPIError({'detail': exc.detail}, exc.status_code, {'Retry-After': '%d' % exc.wait})
+
+    def get_queryset(self):
+        return Task.objects.filter(user=self.user)
+
+    async def get_object(self, pk):
+        task = await self.get_queryset().filter(pk=pk).afirst()
+        if task is None:
+            raise AsyncAPIError({'detail': 'No Task matches the given query.'}, status.HTTP_404_NOT_FOUND)
+        task.user = self.user  # ownership is guaranteed by get_queryset; avoid a lazy (sync) user load
+        return task
+
+    def parse_body(self, request):
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError as exc:
+            raise AsyncAPIError({'detail': f'JSON parse error - {exc}'}, status.HTTP_400_BAD_REQUEST)
+
+    def validate(self, request, instance=None, partial=False):
+        serializer = TaskSerializer(instance, data=self.parse_body(request), partial=partial)
+        if not serializer.is_valid():
+            raise AsyncAPIError(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        return serializer.validated_data
+
+    def serialize(self, task):
+        return TaskSerializer(task).data
+
+
+class AsyncTaskListView(AsyncTaskView):
+    async def get(self, request):
+        # Same filters, validation and ordering as TaskViewSet.list (building the FilterSet runs no query).
+        filterset = TaskFilter(request.GET, queryset=self.get_queryset().order_by(*DEFAULT_ORDERING))
+        if not filterset.is_valid():
+            raise AsyncAPIError(translate_validation(filterset.errors).detail, status.HTTP_400_BAD_REQUEST)
+        queryset = filterset.qs
+
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            raise AsyncAPIError({'detail': 'Invalid page.'}, status.HTTP_404_NOT_FOUND)
+        count = await queryset.acount()
+        offset = (page - 1) * self.page_size
+        if offset and offset >= count:
+            raise AsyncAPIError({'detail': 'Invalid page.'}, status.HTTP_404_NOT_FOUND)
+
+        encode = task_encoder()
+        results = [encode(row) async for row in task_values(queryset)[offset:offset + self.page_size]]
+
+        url = request.build_absolute_uri()
+        next_url = replace_query_param(url, 'page', page + 1) if offset + self.page_size < count else None
+        if page == 1:
+            previous_url = None
+        elif page == 2:
+            previous_url = remove_query_param(url, 'page')
+        else:
+            previous_url = replace_query_param(url, 'page', page - 1)
+        return JsonResponse({'count': count, 'next': next_url, 'previous': previous_url, 'results': results})
+
+    async def post(self, request):
+        data = self.validate(request)
+        task = await Task.objects.acreate(user=self.user, **data)
+        return JsonResponse(self.serialize(task), status=status.HTTP_201_CREATED)
+
+
+class AsyncTaskDetailView(AsyncTaskView):
+    async def get(self, request, pk):
+        return JsonResponse(self.serialize(await self.get_object(pk)))
+
+    async def put(self, request, pk, partial=False):
+        task = await self.get_object(pk)
+        for field, value in self.validate(request, task, partial=partial).items():
+            setattr(task, field, value)
+        await task.asave()
+        return JsonResponse(self.serialize(task))
+
+    async def patch(self, request, pk):
+        return await self.put(request, pk, partial=True)
+
+    async def delete(self, request, pk):
+        task = await self.get_object(pk)
+        await task.adelete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncTaskMarkCompletedView(AsyncTaskView):
+    async def post(self, request, pk):
+        task = await self.get_object(pk)
+        task.status = 'Completed'
+        await task.asave()
+        return JsonResponse(self.serialize(task))
+
+
+def poll(func, *args):
+    """``func(*args)``, then close the thread's database connection: an idle event stream holds none."""
+    try:
+        return func(*args)
+    finally:
+        if not connection.in_atomic_block:  # never while a stream polls; TestCase wraps every test in one
+            connection.close()
+
+
+class TaskEventStreamView(AsyncTaskView):
+    """
+    GET /api/tasks/events/: the user's task changes as Server-Sent Events (ASGI only).
+
+    Event ids are changes-feed cursors, so a reconnecting client's Last-Event-ID resumes
+    exactly where it stopped. The stream sleeps until the user's tasks change (see
+    tasks.events), then sends every change since its last event.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            raise AsyncAPIError({'detail': 'The event stream needs an ASGI server.'}, status.HTTP_501_NOT_IMPLEMENTED)
+        reset = False
+        last_event_id = request.headers.get('Last-Event-ID')
+        try:
+            position, synced_at = check_cursor(last_event_id) if last_event_id else (None, None)
+        except CursorExpired:
+            position, synced_at, reset = None, None, True
+        except APIException:
+            raise AsyncAPIError({'detail': 'Invalid Last-Event-ID.'}, status.HTTP_400_BAD_REQUEST)
+        if position is None:
+            position, synced_at = await sync_to_async(poll)(head_position, self.user.pk), time.time()
+
+        subscription = hub.subscribe(self.user.pk)
+        if subscription is None:
+            response = JsonResponse({'detail': 'Too many open event streams.'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(int(settings.TASK_EVENTS['HEARTBEAT_SECONDS']))
+            return response
+        response = StreamingHttpResponse(
+            self.stream(subscription, position, synced_at, reset), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: pass events through unbuffered
+        return response
+
+    async def stream(self, subscription, position, synced_at, reset):
+        heartbeat = settings.TASK_EVENTS['HEARTBEAT_SECONDS']
+        encode = task_encoder()
+        try:
+            yield f'retry: {int(heartbeat * 1000)}\n\n'
+            if reset:
+                # Changes since the client's cursor may be lost: it has to fetch the full list again.
+                yield f'id: {encode_cursor(*position, int(synced_at))}\nevent: reset\ndata: {{}}\n\n'
+            while True:
+                subscription.changed.clear()  # set again by any change committed while we read
+                events, has_more = await sync_to_async(poll)(change_events, self.user.pk, position)
+                for seq, pk, row in events:
+                    position = (seq, pk)
+                    yield self.frame(position, synced_at, row, encode)
+                if has_more:
+                    continue
+                synced_at = time.time()
+                if not await subscription.wait(heartbeat):
+                    yield ': ping\n\n'
+        finally:
+            hub.unsubscribe(subscription)
+
+    @staticmethod
+    def frame(position, synced_at, row, encode):
+        if row is None:
+            kind, data = 'task.deleted', {'id': position[1]}
+        else:
+            data = encode(row)
+            if row['created_at'].timestamp() >= synced_at:
+                kind = 'task.created'
+            elif row['status'] == 'Completed':
+                kind = 'task.completed'
+            else:
+                kind = 'task.updated'
+        return f'id: {encode_cursor(*position, int(synced_at))}\nevent: {kind}\ndata: {json.dumps(data)}\n\n'
@@ -0,0 +1,164 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .instrumentation import timed
+
+SHARED_KEY = 'auth:user:{}'
+
+
+class UserCache:
+    """
+    Bounded LRU of user instances with a TTL, optionally backed by Django's cache framework.
+
+    Keys are str(user_id): SimpleJWT puts the id claim in the token as a string.
+    """
+
+    def __init__(self, max_size, ttl, shared=False):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    return copy.copy(entry[1])
+                del self._entries[user_id]
+        if self.shared:
+            user = cache.get(SHARED_KEY.format(user_id))
+            if user is not None:
+                self._store_local(user_id, user)
+                return copy.copy(user)
+        return None
+
+    def set(self, user_id, user):
+        user_id = str(user_id)
+        self._store_local(user_id, user)
+        if self.shared:
+            cache.set(SHARED_KEY.format(user_id), user, self.ttl)
+
+    def invalidate(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self.shared:
+            cache.delete(SHARED_KEY.format(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+user_cache = UserCache(
+    max_size=settings.JWT_USER_CACHE['MAX_SIZE'],
+    ttl=settings.JWT_USER_CACHE['TTL'],
+    shared=settings.JWT_USER_CACHE['SHARED'],
+)
+
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+
+def _check_user(user, validated_token):
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+        from rest_framework_simplejwt.utils import get_md5_hash_password
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through ``user_cache``.
+
+    Entries are dropped when the user is saved or deleted (see tasks.signals), and expire
+    after JWT_USER_CACHE['TTL'] seconds as a bound for changes made in other processes.
+    """
+
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+        return _check_user(user, validated_token)
+
+
+class TokenClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Read-only mode: for safe methods the user is built from the token claims (a TokenUser
+    carrying ``user_id`` and ``username``) without any lookup; other methods use the cache.
+
+    Opt in per view with ``authentication_classes``; views using it must only need the
+    user's id and username on GET/HEAD/OPTIONS.
+    """
+
+    def authenticate(self, request):
+        self._safe = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self._safe:
+            _user_id(validated_token)
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        return super().get_user(validated_token)
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """JWTAuthentication for async views: token checks are CPU-only, the user is fetched with the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+            if user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            _check_user(user, validated_token)
+            user_cache.set(user_id, user)
+            return user
+        return _check_user(user, validated_token)
@@ -0,0 +1,81 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+
+class BenchClient(APIClient):
+    """APIClient usable outside the test runner (real ALLOWED_HOSTS, SSL redirect on)."""
+
+    def __init__(self, **defaults):
+        defaults.setdefault('SERVER_NAME', 'localhost')
+        super().__init__(**defaults)
+
+    def generic(self, method, path, data='', content_type='application/octet-stream', secure=True, **extra):
+        return super().generic(method, path, data, content_type, secure=secure, **extra)
+
+
+class BenchAsyncClient(AsyncClient):
+    """AsyncClient counterpart of BenchClient, drives the ASGI handler."""
+
+    async def request(self, **request):
+        headers = [(name, value) for name, value in request['headers'] if name != b'host']
+        request.update(headers=[(b'host', b'localhost'), *headers], scheme='https', server=('127.0.0.1', '443'))
+        return await super().request(**request)
+
+
+class Timer:
+    def __init__(self):
+        self.samples = []
+        self.queries = []
+
+    @contextmanager
+    def measure(self):
+        # The query log is a bounded deque; start empty so long runs are not miscounted.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            yield
+            self.samples.append(time.perf_counter() - start)
+        self.queries.append(len(ctx.captured_queries))
+
+    def record(self, elapsed):
+        self.samples.append(elapsed)
+
+    def percentile(self, pct):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def summary(self, wall_time=None):
+        # For concurrent runs pass the wall-clock duration; latencies overlap.
+        total = wall_time if wall_time is not None else sum(self.samples)
+        result = {
+            'requests': len(self.samples),
+            'total_s': round(total, 4),
+            'rps': round(len(self.samples) / total, 1) if total else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+        }
+        if self.queries:
+            result['queries_per_request'] = round(statistics.fmean(self.queries), 2)
+        return result
+
+
+@contextmanager
+def rollback():
+    """Run a benchmark against the configured database and discard everything it wrote."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def unthrottled():
+    """Switch off the rate limits (tasks.throttling): benchmarks measure the endpoints, not 429s."""
+    return override_settings(TASKS_THROTTLE_RATES={})
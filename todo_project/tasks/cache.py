@@ -0,0 +1,120 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import events
+
+VERSION_KEY = 'tasks:version:{}'
+RESPONSE_KEY = 'tasks:response:{}:{}:{}'
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = 0
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified}
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = self.not_modified = 0
+
+
+stats = CacheStats()
+
+
+def get_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so that an evicted counter never reuses an old version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    key = VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_user_tasks(user_id):
+    # Bump now and again after commit: a reader that saw the first bump may have
+    # cached pre-commit rows under it.
+    bump_version(user_id)
+    transaction.on_commit(lambda: tasks_committed(user_id))
+
+
+def tasks_committed(user_id):
+    bump_version(user_id)
+    events.publish(user_id)
+
+
+def cached_response(request, render, etag_for=None):
+    """
+    Serve a task read from the per-user versioned cache.
+
+    By default the ETag is derived from the user's version counter, so ``If-None-Match`` is
+    answered with 304 without touching the database. With ``etag_for(data)`` (single tasks,
+    whose ETag must also work for ``If-Match``) it comes from the payload and is stored
+    next to it, so a cached entry still answers 304 without a query.
+    """
+    user_id = request.user.pk
+    version = get_version(user_id)
+    fingerprint = f'{request.get_full_path()}|{request.accepted_renderer.format}'
+    digest = hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+    # Weak comparison (as If-None-Match requires): gzip responses carry the ETag as W/"...".
+    client_etags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    etag = None if etag_for else f'"{version:x}-{digest}"'
+
+    if etag in client_etags:
+        stats.incr('not_modified')
+        return _finalize(Response(status=status.HTTP_304_NOT_MODIFIED), etag, None)
+
+    key = RESPONSE_KEY.format(user_id, version, digest)
+    entry = cache.get(key)
+    if entry is not None:
+        data, etag = entry
+        if etag in client_etags:
+            stats.incr('not_modified')
+            return _finalize(Response(status=status.HTTP_304_NOT_MODIFIED), etag, None)
+        stats.incr('hits')
+        return _finalize(Response(data), etag, 'HIT')
+
+    stats.incr('misses')
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        if etag_for:
+            etag = etag_for(response.data)
+        cache.set(key, (response.data, etag), settings.TASKS_RESPONSE_CACHE_TIMEOUT)
+        if etag in client_etags:
+            stats.incr('not_modified')
+            return _finalize(Response(status=status.HTTP_304_NOT_MODIFIED), etag, None)
+        _finalize(response, etag, 'MISS')
+    return response
+
+
+def _finalize(response, etag, outcome):
+    response['ETag'] = etag
+    if outcome:
+        response['X-Cache'] = outcome
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization', 'Accept'))
+    return response
@@ -0,0 +1,136 @@
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .models import Task, TaskTombstone
+from .readpath import READ_FIELDS, encode_tasks
+
+CHANGES_PAGE_SIZE = 500
+START = (-1, 0)  # before every change_seq, including 0 (tasks older than the changes feed)
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The cursor is older than the tombstone retention period; sync again without since.'
+    default_code = 'cursor_expired'
+
+
+def encode_cursor(seq, pk, issued_at):
+    return urlsafe_b64encode(f'{seq}|{pk}|{issued_at}'.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(value):
+    try:
+        seq, pk, issued_at = urlsafe_b64decode(value.encode('ascii')).decode('ascii').split('|')
+        return int(seq), int(pk), int(issued_at)
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+
+
+def check_cursor(value):
+    """Decode a cursor into ((change_seq, id), synced_at); CursorExpired past the tombstone retention."""
+    seq, pk, synced_at = decode_cursor(value)
+    if time.time() - synced_at > settings.TASKS_TOMBSTONE_RETENTION_DAYS * 86400:
+        raise CursorExpired()
+    return (seq, pk), synced_at
+
+
+def stable_horizon(using):
+    """
+    On PostgreSQL change_seq is a transaction id. Rows of transactions at or above the oldest one
+    still running are held back until it finishes, so no change can commit behind a cursor.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def after(position, id_field):
+    # Row comparison on (change_seq, id), spelled so change_seq alone bounds the index range.
+    seq, pk = position
+    return Q(change_seq__gte=seq) & (Q(change_seq__gt=seq) | Q(**{f'{id_field}__gt': pk}))
+
+
+def change_events(user_id, position, include_deleted=True, page_size=None):
+    """
+    Up to ``page_size`` (change_seq, id, row) events after ``position`` in change_seq order;
+    ``row`` is a task_values() row with change_seq, or None for a deleted task. Also returns
+    whether more events follow.
+    """
+    page_size = page_size or CHANGES_PAGE_SIZE
+    tasks = Task.objects.filter(user_id=user_id)
+    tombstones = TaskTombstone.objects.filter(user_id=user_id)
+    horizon = stable_horizon(tasks.db)
+    if horizon is not None:
+        tasks = tasks.filter(change_seq__lt=horizon)
+        tombstones = tombstones.filter(change_seq__lt=horizon)
+
+    rows = tasks.filter(after(position, 'id')).order_by('change_seq', 'id').values(*READ_FIELDS, 'change_seq')
+    events = [(row['change_seq'], row['id'], row) for row in rows[:page_size + 1]]
+    if include_deleted:
+        deleted = tombstones.filter(after(position, 'task_id')).order_by('change_seq', 'task_id')
+        events += [(seq, pk, None) for seq, pk in deleted.values_list('change_seq', 'task_id')[:page_size + 1]]
+    events.sort(key=lambda event: event[:2])
+    return events[:page_size], len(events) > page_size
+
+
+def head_position(user_id):
+    """Position of the user's latest change: following it from here yields only new changes."""
+    events = [START]
+    horizon = stable_horizon(Task.objects.db)
+    for queryset, id_field in ((Task.objects, 'id'), (TaskTombstone.objects, 'task_id')):
+        queryset = queryset.filter(user_id=user_id)
+        if horizon is not None:
+            queryset = queryset.filter(change_seq__lt=horizon)
+        last = queryset.order_by('-change_seq', f'-{id_field}').values_list('change_seq', id_field).first()
+        if last is not None:
+            events.append(last)
+    return max(events)
+
+
+def task_changes(user_id, since=None):
+    """
+    One page of the user's changes after ``since``: tasks created or updated, and ids of deleted
+    tasks, in change_seq order. Without ``since`` every current task is returned (first sync).
+
+    The cursor also records when the client was last fully caught up; once that is longer ago
+    than TASKS_TOMBSTONE_RETENTION_DAYS, tombstones it needs may be gone and CursorExpired is raised.
+    """
+    now = int(time.time())
+    if since is None:
+        position, synced_at = START, now
+    else:
+        position, synced_at = check_cursor(since)
+    events, has_more = change_events(user_id, position, include_deleted=since is not None)
+
+    # A task deleted and then restored in this page is current, so it is not reported as deleted.
+    present = {pk for _, pk, row in events if row is not None}
+    last = events[-1][:2] if events else position
+    return {
+        'results': encode_tasks([row for _, _, row in events if row is not None]),
+        'deleted': list(dict.fromkeys(pk for _, pk, row in events if row is None and pk not in present)),
+        'cursor': encode_cursor(*last, synced_at if has_more else now),
+        'has_more': has_more,
+    }
+
+
+def compact_tombstones(older_than_days, batch_size=5000, using='default'):
+    """Delete tombstones older than ``older_than_days`` in batches; returns how many were removed."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    stale = TaskTombstone.objects.using(using).filter(deleted_at__lt=cutoff)
+    removed = 0
+    while True:
+        ids = list(stale.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += TaskTombstone.objects.using(using).filter(id__in=ids).delete()[0]
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware for responses of at least GZIP_MIN_LENGTH bytes (streamed ones always), for clients
+    that send ``Accept-Encoding: gzip``. Event streams are left alone: gzip would hold events back.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if not response.streaming and len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,120 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import invalidate_user_tasks
+from .models import ArchivedTask, Task, UserDeletion
+from .stats import task_stats
+
+User = get_user_model()
+
+# Tables purged before the user row itself, in this order. Tombstones written by the task deletes are
+# left to manage.py compact_tombstones.
+TABLES = (
+    ('deleted_tasks', Task),
+    ('deleted_archived_tasks', ArchivedTask),
+)
+
+
+def should_defer(user):
+    """True for users whose cascading delete would be too large for one request (USER_DELETION['DEFER_ABOVE'])."""
+    if task_stats(user.pk)['total'] > settings.USER_DELETION['DEFER_ABOVE']:
+        return True
+    return ArchivedTask.objects.filter(user_id=user.pk).exists()
+
+
+def schedule_deletion(user, using='default'):
+    """Deactivate ``user`` and queue their deletion; returns the open UserDeletion (an existing one, if any)."""
+    with transaction.atomic(using=using):
+        if user.is_active:
+            user.is_active = False
+            user.save(update_fields=['is_active'], using=using)  # signals drop the cached user and payloads
+        jobs = UserDeletion.objects.using(using)
+        job = jobs.filter(user_id=user.pk, status__in=[UserDeletion.PENDING, UserDeletion.RUNNING]).first()
+        return job or jobs.create(user_id=user.pk)
+
+
+def claim_deletion(worker, using='default'):
+    """
+    Take the oldest pending job, or a running one whose worker has made no progress for
+    USER_DELETION['STALE_SECONDS']; None when there is nothing to do. Workers skip each other's
+    locked rows, so any number of them can poll the queue.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.USER_DELETION['STALE_SECONDS'])
+    with transaction.atomic(using=using):
+        job = (
+            UserDeletion.objects.using(using).select_for_update(skip_locked=True)
+            .filter(Q(status=UserDeletion.PENDING) | Q(status=UserDeletion.RUNNING, heartbeat_at__lt=stale))
+            .order_by('id').first()
+        )
+        if job is None:
+            return None
+        job.status = UserDeletion.RUNNING
+        job.worker = worker
+        job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'worker', 'heartbeat_at', 'attempts'])
+    return job
+
+
+class UserPurger:
+    """
+    Delete one queued user: their tasks and archived tasks ``batch_size`` rows per transaction,
+    then the user row. Each batch reads at most ``batch_size`` ids and records its progress on
+    the job in the same transaction, so memory use does not grow with the number of tasks and an
+    interrupted job resumes where it stopped. The triggers on tasks_task keep the stats and write
+    tombstones as for any other delete.
+    """
+
+    def __init__(self, job, batch_size=None, using='default'):
+        self.job = job
+        self.batch_size = batch_size or settings.USER_DELETION['BATCH_SIZE']
+        self.using = using
+
+    def run(self, pause=0.0, progress=None):
+        """Purge until done; ``progress(job)`` is called after every batch. Returns the finished job."""
+        try:
+            for field, model in TABLES:
+                while self.delete_batch(field, model):
+                    if progress:
+                        progress(self.job)
+                    if pause:
+                        time.sleep(pause)
+            self.finish()
+        except Exception as e:
+            self.update(status=UserDeletion.FAILED, error=repr(e), finished_at=timezone.now())
+            raise
+        return self.job
+
+    def delete_batch(self, field, model):
+        with transaction.atomic(using=self.using):
+            ids = list(
+                model.objects.using(self.using).filter(user_id=self.job.user_id)
+                .order_by('id').values_list('id', flat=True)[:self.batch_size]
+            )
+            if not ids:
+                return 0
+            with connections[self.using].cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {model._meta.db_table} WHERE id IN ({", ".join(["%s"] * len(ids))})', ids
+                )
+                deleted = cursor.rowcount
+            self.update(**{field: F(field) + deleted, 'batches': F('batches') + 1, 'heartbeat_at': timezone.now()})
+        return deleted
+
+    def finish(self):
+        with transaction.atomic(using=self.using):
+            # Nothing large is left to cascade to: stats rows, tokens, admin log entries.
+            User.objects.using(self.using).filter(pk=self.job.user_id).delete()
+            invalidate_user_tasks(self.job.user_id)
+            self.update(status=UserDeletion.DONE, error='', finished_at=timezone.now())
+
+    def update(self, **fields):
+        jobs = UserDeletion.objects.using(self.using).filter(pk=self.job.pk)
+        jobs.update(**fields)
+        self.job = jobs.get()
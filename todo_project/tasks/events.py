@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """One open event stream. ``notify`` may be called from any thread."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        try:
+            self.loop.call_soon_threadsafe(self.changed.set)
+        except RuntimeError:
+            pass  # the stream's event loop has already closed
+
+    async def wait(self, timeout):
+        """True when notified, False after ``timeout`` seconds without a notification."""
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class EventHub:
+    """
+    Open streams of this process, by user. A notification only wakes the user's streams, which
+    then read what changed from the changes feed: it carries no data and repeated ones coalesce.
+    An idle stream is one asyncio.Event, so one event loop can hold thousands of them.
+    """
+
+    def __init__(self, max_per_user):
+        self.max_per_user = max_per_user
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """A new Subscription, or None if the user already has max_per_user open streams."""
+        subscription = Subscription(user_id)
+        with self._lock:
+            current = self._subscriptions[user_id]
+            if len(current) >= self.max_per_user:
+                return None
+            current.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            current = self._subscriptions.get(subscription.user_id)
+            if current is not None:
+                current.discard(subscription)
+                if not current:
+                    del self._subscriptions[subscription.user_id]
+
+    def deliver(self, user_id):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.notify()
+
+    def connections(self, user_id):
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ()))
+
+
+class LocalBackend:
+    """
+    Delivers to streams in this process only: enough for a single ASGI process. With several,
+    use a backend that sends publish() through a shared broker (e.g. Redis pub/sub) and calls
+    hub.deliver() in every process that receives it.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, user_id):
+        self.hub.deliver(user_id)
+
+
+hub = EventHub(settings.TASK_EVENTS['MAX_CONNECTIONS_PER_USER'])
+backend = import_string(settings.TASK_EVENTS['BACKEND'])(hub)
+
+
+def publish(user_id):
+    """Tell the user's open streams that their tasks changed. Call after the change is committed."""
+    backend.publish(user_id)
@@ -0,0 +1,71 @@
+import csv
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+EXPORT_FIELDS = ('id', 'title', 'description', 'status', 'created_at', 'updated_at')
+EXPORT_COLUMNS = ('id', 'title', 'description', 'status', 'user', 'created_at', 'updated_at')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class NDJSONRenderer(JSONRenderer):
+    # Export rows are streamed by the view; the renderer only takes part in ?format= negotiation
+    # and renders error bodies.
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(JSONRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def format_datetime(value):
+    # Same output as rest_framework.fields.DateTimeField for UTC values.
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def task_rows(queryset, username):
+    """Yield export rows from a server-side cursor; the owner is the same for every row, so no join."""
+    rows = queryset.order_by('created_at', 'id').values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for pk, title, description, status, created_at, updated_at in rows:
+        yield pk, title, description, status, username, format_datetime(created_at), format_datetime(updated_at)
+
+
+def ndjson_stream(rows):
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for row in rows:
+        yield dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def batched(lines, size=500):
+    # Fewer, larger writes to the socket than one per row.
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) == size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+STREAMS = {
+    'ndjson': (ndjson_stream, NDJSONRenderer.media_type),
+    'csv': (csv_stream, CSVRenderer.media_type),
+}
@@ -0,0 +1,42 @@
+from django_filters import rest_framework as filters
+
+from .models import Task, TaskWithArchive
+
+# Every ordering ends with id in the same direction, so a (user, [status,] <field>, id) index
+# returns rows already sorted and pages are stable.
+ORDERINGS = {
+    'created_at': ('created_at', 'id'),
+    '-created_at': ('-created_at', '-id'),
+    'updated_at': ('updated_at', 'id'),
+    '-updated_at': ('-updated_at', '-id'),
+}
+DEFAULT_ORDERING = ORDERINGS['created_at']
+
+
+class StatusInFilter(filters.BaseInFilter, filters.ChoiceFilter):
+    pass
+
+
+class TaskFilter(filters.FilterSet):
+    """
+    Filters and orderings for the task list. Each combination is served by an index on
+    tasks_task: (user, [status,] created_at, id) or (user, [status,] updated_at, id).
+    """
+    status__in = StatusInFilter(field_name='status', lookup_expr='in', choices=Task.STATUS_CHOICES)
+    ordering = filters.ChoiceFilter(choices=[(key, key) for key in ORDERINGS], method='order_by')
+
+    class Meta:
+        model = Task
+        fields = {
+            'status': ['exact'],
+            'created_at': ['gte', 'lte'],
+            'updated_at': ['gte', 'lte'],
+        }
+
+    def order_by(self, queryset, name, value):
+        return queryset.order_by(*ORDERINGS[value])
+
+
+class TaskWithArchiveFilter(TaskFilter):
+    class Meta(TaskFilter.Meta):
+        model = TaskWithArchive
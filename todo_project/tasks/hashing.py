@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.password_validation import validate_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, try again shortly.'
+    default_code = 'password_hashing_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait  # DRF's exception handler turns this into Retry-After
+
+
+class PasswordPool:
+    """
+    Runs password hashing and verification on a fixed number of worker threads.
+
+    PBKDF2 (hashlib) releases the GIL, so the workers use real cores while request threads
+    wait; capping them keeps a burst of logins from taking every CPU. At most ``workers +
+    max_queue`` jobs are admitted; beyond that, callers get PasswordHashingBusy (503).
+    """
+
+    def __init__(self, workers, max_queue, retry_after):
+        self.workers = workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy(self.retry_after)
+        try:
+            return self.executor.submit(fn, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password')
+        return self._executor
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASHING['WORKERS'],
+    max_queue=settings.PASSWORD_HASHING['MAX_QUEUE'],
+    retry_after=settings.PASSWORD_HASHING['RETRY_AFTER'],
+)
+
+
+def hash_password(password):
+    return password_pool.run(make_password, password)
+
+
+def run_password_validators(password, user=None):
+    password_pool.run(validate_password, password, user)
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend whose password checks run on password_pool. The user is loaded and saved on
+    the request thread; only the hasher runs in the pool. A correct password stored with an
+    outdated hasher or work factor is re-hashed with the preferred one.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash once anyway so unknown usernames take as long as wrong passwords (#20760).
+            hash_password(password)
+            return None
+        is_correct, must_update = password_pool.run(verify_password, password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = hash_password(password)
+            user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+import time
+
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import invalidate_user_tasks
+from .models import Task
+from .serializers import TaskSerializer
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = {
+    'application/x-ndjson': 'ndjson',
+    'application/json': 'ndjson',
+    'text/csv': 'csv',
+}
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+
+
+def parse_rows(lines, fmt):
+    """Yield ``(line_number, row_or_None)`` from an iterable of text lines."""
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+class TaskImporter:
+    """
+    Load tasks for one user from a stream of NDJSON or CSV lines.
+
+    Rows are validated with TaskSerializer's title/status rules and written a chunk at a time,
+    each chunk in its own transaction: PostgreSQL COPY where available, bulk_create otherwise.
+    Invalid rows are skipped and reported; valid rows are loaded.
+    """
+
+    def __init__(self, user, chunk_size=IMPORT_CHUNK_SIZE, using='default'):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.using = using
+        self.rules = TaskSerializer()
+        self.total = self.imported = self.failed = 0
+        self.errors = []
+        self.undecodable = set()
+
+    def decode(self, lines):
+        """
+        Text lines from UTF-8 byte lines, without the BOM of the first one. Bytes that are not
+        UTF-8 become U+FFFD and the row they belong to is rejected.
+        """
+        for number, line in enumerate(lines, start=1):
+            try:
+                text = line.decode('utf-8')
+            except UnicodeDecodeError:
+                self.undecodable.add(number)
+                text = line.decode('utf-8', 'replace')
+            yield text.removeprefix('\ufeff') if number == 1 else text
+
+    def run(self, lines, fmt):
+        started = time.perf_counter()
+        chunk = []
+        previous = 0
+        for number, row in parse_rows(lines, fmt):
+            self.total += 1
+            # A CSV row may span several lines: those after the previous row's, up to its own.
+            if self.undecodable and not self.undecodable.isdisjoint(range(previous + 1, number + 1)):
+                values = self.reject(number, {'non_field_errors': ['Not valid UTF-8.']})
+            else:
+                values = self.validate(number, row)
+            previous = number
+            if values is not None:
+                chunk.append(values)
+            if len(chunk) >= self.chunk_size:
+                self.load(chunk)
+                chunk = []
+        if chunk:
+            self.load(chunk)
+        if self.imported:
+            invalidate_user_tasks(self.user.pk)
+        return self.report(time.perf_counter() - started)
+
+    def validate(self, number, row):
+        if row is None:
+            return self.reject(number, {'non_field_errors': ['Invalid row.']})
+
+        errors = {}
+        title = row.get('title')
+        status = row.get('status') or 'New'
+        description = row.get('description') or ''
+        # Strip like DRF's CharField(trim_whitespace=True) before the serializer's own rules.
+        if isinstance(title, str):
+            title = title.strip()
+        if isinstance(description, str):
+            description = description.strip()
+        if title is None:
+            errors['title'] = ['This field is required.']
+        elif not isinstance(title, str):
+            errors['title'] = ['Not a valid string.']
+        elif not title:
+            errors['title'] = ['This field may not be blank.']
+        elif len(title) > TITLE_MAX_LENGTH:
+            errors['title'] = [f'Ensure this field has no more than {TITLE_MAX_LENGTH} characters.']
+        else:
+            try:
+                self.rules.validate_title(title)
+            except serializers.ValidationError as exc:
+                errors['title'] = exc.detail
+        try:
+            self.rules.validate_status(status)
+        except serializers.ValidationError as exc:
+            errors['status'] = exc.detail
+        if not isinstance(description, str):
+            errors['description'] = ['Not a valid string.']
+        if errors:
+            return self.reject(number, errors)
+        return title, description, status
+
+    def reject(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': errors})
+        return None
+
+    def load(self, chunk):
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            if connection.vendor == 'postgresql':
+                self.copy(connection, chunk)
+            else:
+                Task.objects.using(self.using).bulk_create(
+                    [Task(title=t, description=d, status=s, user=self.user) for t, d, s in chunk],
+                    batch_size=1000,
+                )
+        self.imported += len(chunk)
+
+    def copy(self, connection, chunk):
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for title, description, status in chunk:
+            writer.writerow((title, description, status, self.user.pk, now, now))
+        buffer.seek(0)
+        sql = (
+            'COPY tasks_task (title, description, status, user_id, created_at, updated_at) '
+            'FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (title, description))'
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def report(self, elapsed):
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_sec': round(self.total / elapsed, 1) if elapsed else None,
+        }
@@ -0,0 +1,260 @@
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger('tasks.requests')
+
+_current = ContextVar('request_timings', default=None)
+
+# WSGI environ / request.META key of requests that are not counted (tasks.startup.warmup()'s own request).
+SKIP_METRICS = 'tasks.skip_metrics'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, (list(buckets), total, count)) for labels, (buckets, total, count)
+                            in self._series.items())
+        for labels, (buckets, total, count) in series:
+            base = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            prefix = f'{base},' if base else ''
+            cumulative = 0
+            for bound, hits in zip(self.buckets, buckets):
+                cumulative += hits
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{base}}} {total}')
+            lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request duration by view.', DURATION_BUCKETS, ('view', 'method', 'status')
+)
+DB_QUERIES = Histogram('http_request_db_queries', 'Database queries per sampled request.', QUERY_BUCKETS, ('view',))
+DB_DURATION = Histogram('http_request_db_seconds', 'Database time per sampled request.', DURATION_BUCKETS, ('view',))
+SERIALIZER_DURATION = Histogram(
+    'http_request_serializer_seconds', 'Serializer time per sampled request (includes the queries it runs).',
+    DURATION_BUCKETS, ('view',),
+)
+AUTH_DURATION = Histogram(
+    'http_request_auth_seconds', 'Authentication time per sampled request.', DURATION_BUCKETS, ('view',)
+)
+METRICS = (REQUEST_DURATION, DB_QUERIES, DB_DURATION, SERIALIZER_DURATION, AUTH_DURATION)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db = self.serializer = self.auth = 0.0
+        self._open = set()
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'serializer;dur={self.serializer * 1000:.1f}',
+            f'auth;dur={self.auth * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+@contextmanager
+def timed(name):
+    """Add the block's duration to the current request's ``name`` timing (outermost block only)."""
+    timings = _current.get()
+    if timings is None or name in timings._open:
+        yield
+        return
+    timings._open.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, name, getattr(timings, name) + time.perf_counter() - start)
+        timings._open.discard(name)
+
+
+def record_query(execute, sql, params, many, context):
+    # Installed on every database connection (see install()).
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+class TimedSerializerMixin:
+    """For the project's serializers: validation and representation count as the request's serializer time."""
+
+    def is_valid(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+def install():
+    """
+    Hook every database connection. Called from TasksConfig.ready(). Serializer and auth time come
+    from timed() in the project's own serializers (TimedSerializerMixin) and authentication classes.
+    """
+    from django.db.backends.signals import connection_created
+
+    def add_wrapper(sender, connection, **kwargs):
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+    connection_created.connect(add_wrapper, weak=False, dispatch_uid='tasks.instrumentation')
+    for connection in connections.all(initialized_only=True):
+        add_wrapper(None, connection)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match.view_name or match.func.__qualname__
+    actions = getattr(match.func, 'actions', None)
+    if actions:
+        return f'{view_class.__name__}.{actions.get(request.method.lower(), request.method.lower())}'
+    return view_class.__name__
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every request per view and logs slow ones. Sampled requests (REQUEST_METRICS['SAMPLE_RATE'])
+    also record query count, DB, serializer and auth time, returned as Server-Timing and kept in
+    the histograms served by metrics_view. Unsampled requests skip the breakdown entirely.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = settings.REQUEST_METRICS
+        self.sample_rate = config['SAMPLE_RATE']
+        self.slow_seconds = config['SLOW_REQUEST_MS'] / 1000
+        self.server_timing = config['SERVER_TIMING']
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.META.get(SKIP_METRICS):
+            return self.get_response(request)
+        timings, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        timings, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        return self.finish(request, response, timings, start)
+
+    def start(self):
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            timings = RequestTimings()
+            return timings, _current.set(timings), time.perf_counter()
+        return None, None, time.perf_counter()
+
+    def finish(self, request, response, timings, start):
+        total = time.perf_counter() - start
+        view = view_name(request)
+        REQUEST_DURATION.observe(total, view, request.method, response.status_code)
+        if timings is not None:
+            DB_QUERIES.observe(timings.queries, view)
+            DB_DURATION.observe(timings.db, view)
+            SERIALIZER_DURATION.observe(timings.serializer, view)
+            AUTH_DURATION.observe(timings.auth, view)
+            if self.server_timing:
+                response['Server-Timing'] = timings.server_timing(total)
+        if total >= self.slow_seconds:
+            self.log_slow(request, response, view, total, timings)
+        return response
+
+    def log_slow(self, request, response, view, total, timings):
+        fields = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 1),
+        }
+        if timings is not None:
+            fields.update({
+                'db_queries': timings.queries,
+                'db_ms': round(timings.db * 1000, 1),
+                'serializer_ms': round(timings.serializer * 1000, 1),
+                'auth_ms': round(timings.auth * 1000, 1),
+            })
+        message = ' '.join(f'{key}={value}' for key, value in fields.items())
+        logger.warning('Slow request %s', message, extra={'request_metrics': fields})
+
+
+def metrics_view(request):
+    # Scrapers send REQUEST_METRICS['TOKEN'] as a bearer token; staff may also look with their admin session.
+    token = settings.REQUEST_METRICS['TOKEN']
+    authorized = token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized and not request.user.is_staff:
+        return HttpResponseForbidden()
+    body = '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,49 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.archive import ARCHIVE_BATCH_SIZE, TaskArchiver, restore_tasks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Move Completed tasks not updated for --older-than-days into the archive table, in batches of '
+        'one short transaction each. Safe to interrupt and re-run. --restore moves a user\'s archived '
+        'tasks back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.TASKS_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches (default: until done).')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--restore', metavar='USERNAME', help='Restore all archived tasks of this user instead.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, older_than_days, batch_size, max_batches, sleep, restore, database, **options):
+        if restore:
+            user = User.objects.using(database).filter(username=restore).first()
+            if user is None:
+                raise CommandError('Unknown username.')
+            self.stdout.write(json.dumps({'restored': restore_tasks(user.pk, using=database)}, indent=2))
+            return
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        archiver = TaskArchiver(cutoff, batch_size=batch_size, using=database)
+        start = time.perf_counter()
+        archiver.run(max_batches=max_batches, pause=sleep)
+        self.stdout.write(json.dumps({
+            'cutoff': cutoff.isoformat(),
+            'archived': archiver.archived,
+            'batches': archiver.batches,
+            'remaining': archiver.candidates().count(),
+            'elapsed_s': round(time.perf_counter() - start, 3),
+        }, indent=2))
@@ -0,0 +1,151 @@
+import json
+import random
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.bench import BenchClient, Timer, rollback, unthrottled
+from tasks.models import Task
+
+User = get_user_model()
+
+PASSWORD = 'BenchPass123!'
+STATUSES = [choice[0] for choice in Task.STATUS_CHOICES]
+COLUMNS = ('requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed users with skewed task counts and drive the main API endpoints in-process: register, token, '
+        'task CRUD, filtered list and mark_completed. Prints a table and optionally JSON (changes are rolled back).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=500, help='Average tasks per user.')
+        parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of tasks per user; 0 is uniform.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--json', dest='json_path', metavar='PATH',
+            help='Also write a JSON report to PATH ("-": JSON only, on stdout).',
+        )
+
+    @unthrottled()
+    def handle(self, *args, users, tasks, skew, requests, seed, json_path, **options):
+        self.rng = random.Random(seed)
+        with rollback():
+            self.seed_data(users, tasks, skew)
+            results = self.run_scenarios(requests)
+
+        report = {
+            'vendor': connection.vendor,
+            'django': django.get_version(),
+            'users': users,
+            'tasks': sum(self.sizes),
+            'largest_account': max(self.sizes),
+            'requests_per_endpoint': requests,
+            'results': results,
+        }
+        if json_path == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if json_path:
+            with open(json_path, 'w') as target:
+                json.dump(report, target, indent=2)
+        self.stdout.write(self.table(report))
+
+    def seed_data(self, users, tasks, skew):
+        weights = [1 / (rank + 1) ** skew for rank in range(users)]
+        scale = users * tasks / sum(weights)
+        self.sizes = [max(1, round(weight * scale)) for weight in weights]
+
+        password = make_password(PASSWORD)  # hashed once: seeding should not be bound by PBKDF2
+        self.users = User.objects.bulk_create(
+            [User(username=f'bench_api_{i}', first_name='Bench', password=password) for i in range(users)]
+        )
+        batch = []
+        for user, size in zip(self.users, self.sizes):
+            for i in range(size):
+                batch.append(Task(title=f'Task {i}', description='bench', status=self.rng.choice(STATUSES), user=user))
+                if len(batch) == 5000:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+        Task.objects.bulk_create(batch)
+        self.ids = {user.pk: [] for user in self.users}
+        for user_id, pk in Task.objects.filter(user__in=self.users).values_list('user_id', 'id'):
+            self.ids[user_id].append(pk)
+        self.clients = [BenchClient(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}') for user in self.users]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE tasks_task')
+
+    def run_scenarios(self, requests):
+        created = {user.pk: [] for user in self.users}
+
+        def pick(i):
+            # Round-robin over accounts, so large and small ones are both exercised.
+            user = self.users[i % len(self.users)]
+            return user, self.clients[i % len(self.clients)]
+
+        def register(i, user, client):
+            payload = {'username': f'bench_api_new_{i}', 'password': PASSWORD, 'first_name': 'Bench'}
+            return BenchClient().post(reverse('user-register'), payload, format='json'), 201
+
+        def token(i, user, client):
+            payload = {'username': user.username, 'password': PASSWORD}
+            return BenchClient().post(reverse('token_obtain_pair'), payload, format='json'), 200
+
+        def task_create(i, user, client):
+            response = client.post(reverse('tasks-list'), {'title': f'New {i}', 'description': 'bench'}, format='json')
+            created[user.pk].append(response.data['id'])
+            return response, 201
+
+        # Reads carry a unique query parameter so the response cache never answers them.
+        def task_list(i, user, client):
+            return client.get(reverse('tasks-list'), {'_': i}), 200
+
+        def task_list_filtered(i, user, client):
+            return client.get(reverse('tasks-list'), {'status': self.rng.choice(STATUSES), '_': i}), 200
+
+        def task_detail(i, user, client):
+            return client.get(reverse('tasks-detail', args=[self.rng.choice(self.ids[user.pk])]), {'_': i}), 200
+
+        def task_update(i, user, client):
+            url = reverse('tasks-detail', args=[self.rng.choice(self.ids[user.pk])])
+            return client.patch(url, {'title': f'Updated {i}'}, format='json'), 200
+
+        def mark_completed(i, user, client):
+            return client.post(reverse('tasks-mark-completed', args=[self.rng.choice(self.ids[user.pk])])), 200
+
+        def task_delete(i, user, client):
+            return client.delete(reverse('tasks-detail', args=[created[user.pk].pop()])), 204
+
+        results = {}
+        for scenario in (register, token, task_create, task_list, task_list_filtered, task_detail,
+                         task_update, mark_completed, task_delete):
+            timer = Timer()
+            for i in range(requests):
+                user, client = pick(i)
+                with timer.measure():
+                    response, expected = scenario(i, user, client)
+                assert response.status_code == expected, (scenario.__name__, response.status_code, response.content)
+            results[scenario.__name__] = timer.summary()
+        return results
+
+    def table(self, report):
+        width = max(len(name) for name in report['results'])
+        lines = [
+            f"{report['vendor']}, Django {report['django']}: {report['users']} users, {report['tasks']} tasks "
+            f"(largest account {report['largest_account']}), {report['requests_per_endpoint']} requests per endpoint",
+            '  '.join([f"{'endpoint':<{width}}", *(f'{column:>{len(column) + 2}}' for column in COLUMNS)]),
+        ]
+        for name, summary in report['results'].items():
+            cells = (f'{summary[column]:>{len(column) + 2}}' for column in COLUMNS)
+            lines.append('  '.join([f'{name:<{width}}', *cells]))
+        return '\n'.join(lines)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.bench import BenchAsyncClient, BenchClient, Timer, unthrottled
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test GET task list at high concurrency: sync view under WSGI (thread pool), '
+        'sync view under ASGI and the async view under ASGI. Reports requests/sec and p99 latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=50)
+
+    @unthrottled()
+    def handle(self, *args, requests, concurrency, tasks, **options):
+        # Worker threads use their own connections, so the dataset is committed and removed afterwards.
+        user = User.objects.create_user(username='bench_async_user', password=None)
+        try:
+            Task.objects.bulk_create([Task(title=f'Task {i}', user=user) for i in range(tasks)])
+            auth = f'Bearer {AccessToken.for_user(user)}'
+            results = {
+                'wsgi_sync_view': self.run_wsgi(reverse('tasks-list'), auth, requests, concurrency),
+                'asgi_sync_view': asyncio.run(self.run_asgi(reverse('tasks-list'), auth, requests, concurrency)),
+                'asgi_async_view': asyncio.run(self.run_asgi(reverse('async-tasks-list'), auth, requests, concurrency)),
+            }
+        finally:
+            user.delete()
+        self.stdout.write(json.dumps({'requests': requests, 'concurrency': concurrency, **results}, indent=2))
+
+    def run_wsgi(self, url, auth, requests, concurrency):
+        timer = Timer()
+
+        def call(i):
+            client = BenchClient(HTTP_AUTHORIZATION=auth)
+            start = time.perf_counter()
+            # A unique query string bypasses the response cache so every request hits the view.
+            response = client.get(url, {'_': i})
+            timer.record(time.perf_counter() - start)
+            close_old_connections()
+            return response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            codes = list(pool.map(call, range(requests)))
+        assert set(codes) == {200}, set(codes)
+        return timer.summary(wall_time=time.perf_counter() - start)
+
+    async def run_asgi(self, url, auth, requests, concurrency):
+        timer = Timer()
+        client = BenchAsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, {'_': i}, headers={'Authorization': auth})
+                timer.record(time.perf_counter() - start)
+                return response.status_code
+
+        start = time.perf_counter()
+        codes = await asyncio.gather(*(call(i) for i in range(requests)))
+        assert set(codes) == {200}, set(codes)
+        return timer.summary(wall_time=time.perf_counter() - start)
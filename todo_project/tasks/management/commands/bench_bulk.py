@@ -0,0 +1,45 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from tasks.bench import BenchClient, Timer, rollback, unthrottled
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare N single POST /api/tasks/ requests with one POST /api/tasks/bulk/ call (changes are rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000)
+
+    @unthrottled()
+    def handle(self, *args, count, **options):
+        payload = [{'title': f'Task {i}', 'description': 'bench', 'status': 'New'} for i in range(count)]
+        single, bulk = Timer(), Timer()
+
+        with rollback():
+            user = User.objects.create_user(username='bench_bulk_user', password=None)
+            client = BenchClient()
+            client.force_authenticate(user=user)
+
+            for item in payload:
+                with single.measure():
+                    response = client.post(reverse('tasks-list'), item, format='json')
+                assert response.status_code == 201, response.content
+
+            with bulk.measure():
+                response = client.post(reverse('tasks-bulk'), payload, format='json')
+            assert response.status_code == 201, response.content
+
+        single_total = single.summary()
+        bulk_total = bulk.summary()
+        result = {
+            'count': count,
+            'single': {'total_s': single_total['total_s'], 'queries': sum(single.queries)},
+            'bulk': {'total_s': bulk_total['total_s'], 'queries': sum(bulk.queries)},
+            'speedup': round(single_total['total_s'] / bulk_total['total_s'], 1) if bulk_total['total_s'] else None,
+        }
+        self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,79 @@
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tasks.bench import Timer
+from tasks.models import Task
+from tasks.readpath import encode_tasks
+from tasks.renderers import ORJSONParser, ORJSONRenderer
+
+CODECS = {
+    'stdlib': (JSONRenderer(), JSONParser()),
+    'orjson': (ORJSONRenderer(), ORJSONParser()),
+}
+STATUSES = [choice[0] for choice in Task.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        'Render and parse a task list payload of --rows rows with DRF\'s JSONRenderer/JSONParser and the orjson '
+        'ones, then gzip it as the middleware would. Reports wall and CPU time per payload and bytes on the wire.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, rows, repeat, **options):
+        data = {'count': rows, 'next': None, 'previous': None, 'results': encode_tasks(self.rows(rows))}
+        bodies = {name: renderer.render(data) for name, (renderer, _) in CODECS.items()}
+        report = {'rows': rows, 'repeat': repeat, 'identical_output': len(set(bodies.values())) == 1}
+
+        for name, (renderer, parser) in CODECS.items():
+            body = bodies[name]
+            report[name] = {
+                'render': self.measure(lambda: renderer.render(data), repeat),
+                'parse': self.measure(lambda: parser.parse(io.BytesIO(body)), repeat),
+                'bytes': len(body),
+            }
+        body = bodies['stdlib']
+        compressed = compress_string(body, max_random_bytes=100)
+        report['gzip'] = {
+            **self.measure(lambda: compress_string(body, max_random_bytes=100), repeat),
+            'bytes': len(compressed),
+            'ratio': round(len(body) / len(compressed), 2),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def rows(self, count):
+        # task_values() rows: the list view's payload without needing a database.
+        rng = random.Random(42)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for pk in range(1, count + 1):
+            created = start + timedelta(seconds=rng.randrange(10**7), microseconds=rng.randrange(10**6))
+            yield {
+                'id': pk,
+                'title': f'Task {pk} – ré-check "quotes"',
+                'description': 'Prepare the quarterly report and send it to the team.\n' * rng.randrange(1, 4),
+                'status': rng.choice(STATUSES),
+                'user__username': f'user_{pk % 50}',
+                'created_at': created,
+                'updated_at': created + timedelta(minutes=rng.randrange(10**4)),
+            }
+
+    def measure(self, run, repeat):
+        wall, cpu = Timer(), Timer()
+        for _ in range(repeat):
+            start_wall, start_cpu = time.perf_counter(), time.process_time()
+            run()
+            wall.record(time.perf_counter() - start_wall)
+            cpu.record(time.process_time() - start_cpu)
+        summary = wall.summary()
+        return {'p50_ms': summary['p50_ms'], 'p95_ms': summary['p95_ms'], 'cpu_ms': cpu.summary()['p50_ms']}
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.bench import BenchClient, Timer, unthrottled
+from tasks.hashing import password_pool
+
+User = get_user_model()
+
+PASSWORD = 'BenchPass123!'
+BACKENDS = {
+    'inline': 'django.contrib.auth.backends.ModelBackend',
+    'pool': 'tasks.hashing.PooledModelBackend',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent POST /api/token/ requests with hashing inline and on the password pool, while one '
+        'client keeps calling a cheap endpoint. Reports login throughput, shed (503) requests and the '
+        'latency of the other traffic.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=64)
+        parser.add_argument('--concurrency', type=int, default=16)
+
+    @unthrottled()
+    def handle(self, *args, requests, concurrency, **options):
+        # Worker threads use their own connections, so the user is committed and removed afterwards.
+        user = User.objects.create_user(username='bench_login_user', password=PASSWORD)
+        try:
+            auth = f'Bearer {AccessToken.for_user(user)}'
+            results = {}
+            for mode, backend in BACKENDS.items():
+                with override_settings(AUTHENTICATION_BACKENDS=[backend]):
+                    results[mode] = self.run(user.username, auth, requests, concurrency)
+        finally:
+            user.delete()
+        self.stdout.write(json.dumps({
+            'requests': requests,
+            'concurrency': concurrency,
+            'pool_workers': password_pool.workers,
+            **results,
+        }, indent=2))
+
+    def run(self, username, auth, requests, concurrency):
+        logins, probe = Timer(), Timer()
+        codes = Counter()
+        done = threading.Event()
+
+        def login(i):
+            start = time.perf_counter()
+            response = BenchClient().post(reverse('token_obtain_pair'), {'username': username, 'password': PASSWORD})
+            logins.record(time.perf_counter() - start)
+            close_old_connections()
+            return response.status_code
+
+        def other_traffic():
+            client = BenchClient(HTTP_AUTHORIZATION=auth)
+            while not done.is_set():
+                start = time.perf_counter()
+                response = client.get(reverse('tasks-stats'))
+                probe.record(time.perf_counter() - start)
+                assert response.status_code == 200, response.status_code
+            close_old_connections()
+
+        prober = threading.Thread(target=other_traffic)
+        prober.start()
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                codes.update(pool.map(login, range(requests)))
+        finally:
+            done.set()
+            prober.join()
+        summary = logins.summary(wall_time=time.perf_counter() - start)
+        assert set(codes) <= {200, 503}, codes
+        return {
+            'logins': summary,
+            'ok_per_sec': round(codes[200] / summary['total_s'], 1),
+            'shed_503': codes[503],
+            'other_traffic': {key: value for key, value in probe.summary().items() if key.startswith('p')},
+        }
@@ -0,0 +1,60 @@
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+
+from tasks.bench import BenchClient, Timer, rollback, unthrottled
+from tasks.cache import bump_version
+from tasks.models import Task
+from tasks.search import search_tasks
+
+User = get_user_model()
+
+WORDS = (
+    'report review deploy invoice meeting budget design sprint backlog release customer '
+    'support database migration refactor onboarding hiring roadmap security audit'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Seed a large task table, time ?search= queries and print their query plan (changes are rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200_000)
+        parser.add_argument('--query', default='secur aud')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    @unthrottled()
+    def handle(self, *args, tasks, query, repeat, **options):
+        rng = random.Random(42)
+        timer = Timer()
+
+        with rollback():
+            user = User.objects.create_user(username='bench_search_user', password=None)
+            batch = []
+            for i in range(tasks):
+                title = ' '.join(rng.choices(WORDS, k=3))
+                batch.append(Task(title=f'{title} {i}', description=' '.join(rng.choices(WORDS, k=12)), user=user))
+                if len(batch) == 5000:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+            Task.objects.bulk_create(batch)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE tasks_task')
+
+            client = BenchClient()
+            client.force_authenticate(user=user)
+            for _ in range(repeat):
+                bump_version(user.pk)  # measure the query, not the response cache
+                with timer.measure():
+                    response = client.get(reverse('tasks-list'), {'search': query})
+                assert response.status_code == 200, response.content
+
+            plan = search_tasks(Task.objects.filter(user=user), query).order_by('-rank', '-id')[:10].explain()
+
+        self.stdout.write(json.dumps({'tasks': tasks, 'query': query, 'vendor': connection.vendor, **timer.summary()}, indent=2))
+        self.stdout.write(plan)
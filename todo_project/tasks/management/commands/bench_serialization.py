@@ -0,0 +1,51 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from tasks.bench import Timer, rollback
+from tasks.models import Task
+from tasks.readpath import encode_tasks, task_values
+from tasks.serializers import TaskSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Time TaskSerializer against the values() read path for the same rows (changes are rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, rows, repeat, **options):
+        variants = {
+            # The queryset the list view used to hand to the serializer: one query per row for user.username.
+            'serializer': lambda qs: TaskSerializer(qs, many=True).data,
+            'serializer_select_related': lambda qs: TaskSerializer(qs.select_related('user'), many=True).data,
+            'values_encoder': lambda qs: encode_tasks(task_values(qs)),
+        }
+        timers = {name: Timer() for name in variants}
+
+        with rollback():
+            user = User.objects.create_user(username='bench_serialization_user', password=None)
+            Task.objects.bulk_create(
+                [Task(title=f'Task {i}', description='bench ' * 10, user=user) for i in range(rows)], batch_size=1000
+            )
+            queryset = Task.objects.filter(user=user).order_by('created_at', 'id')
+            for _ in range(repeat):
+                for name, serialize in variants.items():
+                    # .all(): a fresh queryset each run, so no rows or related users are cached.
+                    with timers[name].measure():
+                        data = serialize(queryset.all())
+                    assert len(data) == rows
+
+        result = {'rows': rows, 'repeat': repeat}
+        for name, timer in timers.items():
+            summary = timer.summary()
+            result[name] = {
+                'ms_per_1000_rows': round(summary['p50_ms'] * 1000 / rows, 3),
+                'p95_ms': summary['p95_ms'],
+                'queries': summary['queries_per_request'],
+            }
+        self.stdout.write(json.dumps(result, indent=2))
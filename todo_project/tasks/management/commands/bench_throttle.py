@@ -0,0 +1,87 @@
+import json
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.bench import BenchClient, Timer, rollback, unthrottled
+from tasks.throttling import TaskReadThrottle, TokenBucketStore
+
+User = get_user_model()
+
+RATE = '600/min'
+
+
+class CacheHistoryThrottle(UserRateThrottle):
+    """DRF's own per-user throttle: a list of request timestamps per client in the Django cache."""
+    rate = RATE
+
+
+class Command(BaseCommand):
+    help = (
+        'Time one throttle check on the token-bucket store and on DRF\'s cache-backed request history, '
+        'then GET /api/tasks/stats/ with rate limits on and off. Prints JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=100_000)
+        parser.add_argument('--keys', type=int, default=1000, help='Distinct users the checks are spread over.')
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, checks, keys, requests, **options):
+        store = TokenBucketStore()
+        with override_settings(TASKS_THROTTLE_RATES={'tasks_read': RATE}):
+            report = {
+                'checks': checks,
+                'keys': keys,
+                'rate': RATE,
+                'token_bucket_us_per_check': self.time_checks(TaskReadThrottle, checks, keys, store=store),
+                'cache_history_us_per_check': self.time_checks(CacheHistoryThrottle, checks, keys),
+                'buckets_kept': len(store),
+            }
+        report['endpoint'] = self.time_endpoint(requests)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def time_checks(self, throttle_class, checks, keys, **attrs):
+        requests = [
+            SimpleNamespace(method='GET', user=SimpleNamespace(pk=i, is_authenticated=True), META={})
+            for i in range(keys)
+        ]
+        cache.delete_many([f'throttle_user_{i}' for i in range(keys)])
+        start = time.perf_counter()
+        for i in range(checks):
+            # A new instance per check, as DRF builds the throttles for every request.
+            throttle = throttle_class()
+            throttle.__dict__.update(attrs)
+            throttle.allow_request(requests[i % keys], None)
+        elapsed = time.perf_counter() - start
+        cache.delete_many([f'throttle_user_{i}' for i in range(keys)])
+        return round(elapsed / checks * 1e6, 3)
+
+    def time_endpoint(self, requests):
+        timers = {'unthrottled': Timer(), 'throttled': Timer()}
+        # A rate that is never reached: this measures the cost of the check, not of the 429s.
+        modes = {'unthrottled': unthrottled, 'throttled': lambda: override_settings(
+            TASKS_THROTTLE_RATES={'tasks_read': '1000000/s', 'tasks_write': '1000000/s'}
+        )}
+        with rollback():
+            user = User.objects.create_user(username='bench_throttle_user', password=None)
+            client = BenchClient(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            url = reverse('tasks-stats')
+            for i in range(requests):
+                # Interleaved, so both modes see the same warm caches and background noise.
+                for name, mode in modes.items():
+                    with mode(), timers[name].measure():
+                        response = client.get(url)
+                    assert response.status_code == 200, response.status_code
+        result = {name: timer.summary() for name, timer in timers.items()}
+        result['overhead_us_p50'] = round(
+            (result['throttled']['p50_ms'] - result['unthrottled']['p50_ms']) * 1000, 1
+        )
+        return result
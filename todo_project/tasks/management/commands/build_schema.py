@@ -0,0 +1,22 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks.schema import write
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema (JSON and YAML) into API_SCHEMA_DIR under the current code fingerprint, '
+        'so /api/schema/ serves it without generating it. Run it as part of each deploy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Defaults to API_SCHEMA_DIR.')
+
+    def handle(self, *args, output_dir, **options):
+        fp, paths = write(output_dir)
+        self.stdout.write(json.dumps({
+            'fingerprint': fp,
+            'files': {fmt: {'path': str(path), 'bytes': path.stat().st_size} for fmt, path in paths.items()},
+        }, indent=2))
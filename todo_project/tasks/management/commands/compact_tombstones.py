@@ -0,0 +1,22 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.changes import compact_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete tombstones of deleted tasks older than --older-than-days (default '
+        'TASKS_TOMBSTONE_RETENTION_DAYS). Clients holding an older changes cursor get 410 and resync.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.TASKS_TOMBSTONE_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, older_than_days, batch_size, database, **options):
+        removed = compact_tombstones(older_than_days, batch_size=batch_size, using=database)
+        self.stdout.write(json.dumps({'deleted': removed}, indent=2))
@@ -0,0 +1,35 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import IMPORT_CHUNK_SIZE, TaskImporter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from an NDJSON or CSV file (use "-" for stdin) and print a report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Username that will own the imported tasks.')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, path, user, format, chunk_size, database, **options):
+        try:
+            owner = User.objects.using(database).get(username=user)
+        except User.DoesNotExist:
+            raise CommandError(f'User "{user}" does not exist.')
+        fmt = format or ('csv' if path.endswith('.csv') else 'ndjson')
+
+        importer = TaskImporter(owner, chunk_size=chunk_size, using=database)
+        if path == '-':
+            report = importer.run(importer.decode(sys.stdin.buffer), fmt)
+        else:
+            with open(path, 'rb') as source:
+                report = importer.run(importer.decode(source), fmt)
+        self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
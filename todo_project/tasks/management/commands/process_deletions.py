@@ -0,0 +1,87 @@
+import json
+import os
+import socket
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.deletion import UserPurger, claim_deletion
+from tasks.models import UserDeletion
+
+try:
+    import resource
+except ImportError:  # not on Windows: progress is reported without the memory figure
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # bytes on macOS, KiB elsewhere
+
+
+class Command(BaseCommand):
+    help = (
+        'Work through the queue of deferred user deletions: each job deletes the user\'s tasks --batch-size rows '
+        'per transaction, then the user. Prints one JSON line of progress (with the peak RSS) every '
+        '--progress-every batches. Safe to interrupt; run any number of workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.USER_DELETION['BATCH_SIZE'])
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches.')
+        parser.add_argument('--poll', type=float, default=5.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument('--max-jobs', type=int, help='Exit after this many jobs.')
+        parser.add_argument('--progress-every', type=int, default=100)
+        parser.add_argument('--retry-failed', action='store_true', help='Queue failed jobs again first.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, batch_size, sleep, poll, once, max_jobs, progress_every, retry_failed, database,
+               **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+        if retry_failed:
+            UserDeletion.objects.using(database).filter(status=UserDeletion.FAILED).update(
+                status=UserDeletion.PENDING, finished_at=None
+            )
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        jobs = 0
+        while max_jobs is None or jobs < max_jobs:
+            job = claim_deletion(worker, using=database)
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll)
+                continue
+            jobs += 1
+            start = time.perf_counter(), job.deleted_tasks + job.deleted_archived_tasks  # resumed jobs count from here
+
+            def progress(job):
+                if job.batches % progress_every == 0:
+                    self.report(job, start)
+
+            try:
+                job = UserPurger(job, batch_size=batch_size, using=database).run(pause=sleep, progress=progress)
+            except Exception as e:
+                self.stderr.write(f'Deletion {job.pk} of user {job.user_id} failed: {e!r}')
+                continue
+            self.report(job, start)
+
+    def report(self, job, start):
+        started_at, deleted_before = start
+        elapsed = time.perf_counter() - started_at
+        deleted = job.deleted_tasks + job.deleted_archived_tasks - deleted_before
+        self.stdout.write(json.dumps({
+            'job': job.pk,
+            'user_id': job.user_id,
+            'status': job.status,
+            'deleted_tasks': job.deleted_tasks,
+            'deleted_archived_tasks': job.deleted_archived_tasks,
+            'batches': job.batches,
+            'rows_per_s': round(deleted / elapsed) if elapsed else None,
+            'peak_rss_mb': peak_rss_mb(),
+        }))
@@ -0,0 +1,32 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.stats import rebuild_task_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recount per-user task statistics from tasks_task and report any drift that was fixed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help='Only these usernames (repeatable).')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, user, database, **options):
+        user_ids = None
+        if user:
+            user_ids = list(User.objects.using(database).filter(username__in=user).values_list('pk', flat=True))
+            if len(user_ids) != len(set(user)):
+                raise CommandError('Unknown username.')
+        drift = rebuild_task_stats(user_ids, using=database)
+        report = {
+            'fixed': len(drift),
+            'drift': [
+                {'user_id': user_id, 'status': status, 'stored': stored, 'actual': actual}
+                for (user_id, status), (stored, actual) in sorted(drift.items())
+            ],
+        }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+MODES = {'cold': False, 'warm': True}
+
+
+def import_times(stderr):
+    """(module, self µs, cumulative µs) from ``python -X importtime`` output."""
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        yield name.strip(), int(self_us), int(cumulative_us)
+
+
+def package(module):
+    parts = module.split('.')
+    # django and DRF are large; split them one level further.
+    return '.'.join(parts[:2] if parts[0] in ('django', 'rest_framework') else parts[:1])
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the project in fresh interpreters (python -X importtime) and time each phase up to the second '
+        'request, without and with tasks.startup.warmup(). Prints the median of --runs starts and the slowest imports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--username', help='Send the timed requests as this user (default: unauthenticated).')
+
+    def handle(self, *args, runs, top, username, **options):
+        authorization = None
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'No user "{username}".')
+            authorization = f'Bearer {AccessToken.for_user(user)}'
+
+        report = {'runs': runs, 'path': 'GET /api/tasks/', 'authenticated': bool(authorization)}
+        imports = None
+        for mode, warm in MODES.items():
+            starts = []
+            for _ in range(runs):
+                phases, stderr = self.start(warm, authorization)
+                starts.append(phases)
+                imports = imports or list(import_times(stderr))
+            phases = {name: statistics.median(start[name] for start in starts) for name in starts[0]}
+            phases['first_status'] = starts[0]['first_status']
+            # Until the worker can be marked ready; the first request's latency is reported separately.
+            ready = ('settings', 'setup', 'handler', 'warmup')
+            phases['ready_ms'] = round(sum(phases[name] for name in ready if name in phases), 1)
+            report[mode] = phases
+
+        by_package = Counter()
+        for module, self_us, _ in imports:
+            by_package[package(module)] += self_us
+        report['imports'] = {
+            'modules': len(imports),
+            'total_ms': round(sum(self_us for _, self_us, _ in imports) / 1000, 1),
+            'by_package_ms': {name: round(us / 1000, 1) for name, us in by_package.most_common(top)},
+            'slowest_modules_ms': {
+                module: round(self_us / 1000, 1) for module, self_us, _ in sorted(imports, key=lambda i: -i[1])[:top]
+            },
+        }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def start(self, warm, authorization):
+        code = f'from tasks.startup import profile_child; profile_child({warm!r}, {authorization!r})'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE},
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+INDEX_NAME = 'task_search_gin_idx'
+# Kept identical to tasks.search.DOCUMENT_SQL.
+DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(\"tasks_task\".\"title\", '') || ' ' || "
+    "coalesce(\"tasks_task\".\"description\", ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON tasks_task USING GIN ({DOCUMENT_SQL})'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not lock tasks_task for writes.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0005_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Counters are kept by triggers so that QuerySet.update()/delete(), raw SQL and COPY are counted too.
+# Deletes only decrement existing rows: a delete cascading from a user must not re-create stats for it.
+# PostgreSQL uses statement-level triggers with transition tables: one upsert per (user, status)
+# group however many rows a statement touches.
+POSTGRES_SQL = [
+    """
+    CREATE FUNCTION tasks_taskstat_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO tasks_taskstat (user_id, status, "count")
+        SELECT user_id, status, count(*) FROM new_rows GROUP BY user_id, status ORDER BY user_id, status
+        ON CONFLICT (user_id, status) DO UPDATE SET "count" = tasks_taskstat."count" + EXCLUDED."count";
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE FUNCTION tasks_taskstat_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE tasks_taskstat s SET "count" = s."count" - d.n
+        FROM (SELECT user_id, status, count(*) AS n FROM old_rows GROUP BY user_id, status) d
+        WHERE s.user_id = d.user_id AND s.status = d.status;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE FUNCTION tasks_taskstat_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Only rows whose status or owner changed; a title edit writes nothing here.
+        WITH moved AS (
+            SELECT o.user_id AS old_user, o.status AS old_status, n.user_id AS new_user, n.status AS new_status
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.user_id, o.status) IS DISTINCT FROM (n.user_id, n.status)
+        ), deltas AS (
+            SELECT old_user AS user_id, old_status AS status, -1 AS n FROM moved
+            UNION ALL
+            SELECT new_user, new_status, 1 FROM moved
+        )
+        INSERT INTO tasks_taskstat (user_id, status, "count")
+        SELECT user_id, status, sum(n) FROM deltas GROUP BY user_id, status ORDER BY user_id, status
+        ON CONFLICT (user_id, status) DO UPDATE SET "count" = tasks_taskstat."count" + EXCLUDED."count";
+        RETURN NULL;
+    END $$
+    """,
+    'CREATE TRIGGER tasks_taskstat_insert AFTER INSERT ON tasks_task REFERENCING NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT EXECUTE PROCEDURE tasks_taskstat_insert()',
+    'CREATE TRIGGER tasks_taskstat_delete AFTER DELETE ON tasks_task REFERENCING OLD TABLE AS old_rows '
+    'FOR EACH STATEMENT EXECUTE PROCEDURE tasks_taskstat_delete()',
+    'CREATE TRIGGER tasks_taskstat_update AFTER UPDATE ON tasks_task '
+    'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+    'FOR EACH STATEMENT EXECUTE PROCEDURE tasks_taskstat_update()',
+]
+POSTGRES_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_taskstat_insert ON tasks_task',
+    'DROP TRIGGER IF EXISTS tasks_taskstat_delete ON tasks_task',
+    'DROP TRIGGER IF EXISTS tasks_taskstat_update ON tasks_task',
+    'DROP FUNCTION IF EXISTS tasks_taskstat_insert()',
+    'DROP FUNCTION IF EXISTS tasks_taskstat_delete()',
+    'DROP FUNCTION IF EXISTS tasks_taskstat_update()',
+]
+SQLITE_SQL = [
+    """
+    CREATE TRIGGER tasks_taskstat_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_taskstat (user_id, status, "count") VALUES (NEW.user_id, NEW.status, 1)
+        ON CONFLICT (user_id, status) DO UPDATE SET "count" = "count" + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskstat_delete AFTER DELETE ON tasks_task BEGIN
+        UPDATE tasks_taskstat SET "count" = "count" - 1 WHERE user_id = OLD.user_id AND status = OLD.status;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskstat_update AFTER UPDATE OF user_id, status ON tasks_task
+    WHEN OLD.user_id IS NOT NEW.user_id OR OLD.status IS NOT NEW.status BEGIN
+        UPDATE tasks_taskstat SET "count" = "count" - 1 WHERE user_id = OLD.user_id AND status = OLD.status;
+        INSERT INTO tasks_taskstat (user_id, status, "count") VALUES (NEW.user_id, NEW.status, 1)
+        ON CONFLICT (user_id, status) DO UPDATE SET "count" = "count" + 1;
+    END
+    """,
+]
+SQLITE_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_taskstat_insert',
+    'DROP TRIGGER IF EXISTS tasks_taskstat_delete',
+    'DROP TRIGGER IF EXISTS tasks_taskstat_update',
+]
+BACKFILL_SQL = (
+    'INSERT INTO tasks_taskstat (user_id, status, "count") '
+    'SELECT user_id, status, COUNT(*) FROM tasks_task GROUP BY user_id, status'
+)
+
+
+def create_triggers(apps, schema_editor):
+    statements = {'postgresql': POSTGRES_SQL, 'sqlite': SQLITE_SQL}.get(schema_editor.connection.vendor)
+    if statements is None:
+        return  # other backends: counters only come from rebuild_task_stats
+    for sql in statements:
+        schema_editor.execute(sql)
+    # Creating the triggers locks tasks_task against writes until commit, so nothing is missed.
+    schema_editor.execute(BACKFILL_SQL)
+
+
+def drop_triggers(apps, schema_editor):
+    for sql in {'postgresql': POSTGRES_DROP_SQL, 'sqlite': SQLITE_DROP_SQL}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('New', 'New'), ('In Progress', 'In Progress'), ('Completed', 'Completed'), ('Pending', 'Pending')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'status'), name='taskstat_user_status_uniq')],
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
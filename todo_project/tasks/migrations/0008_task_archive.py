@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+PARTITIONED_TABLE_SQL = """
+CREATE TABLE tasks_archivedtask (
+    id bigint NOT NULL,
+    title varchar(255) NOT NULL,
+    description text NOT NULL,
+    status varchar(20) NOT NULL,
+    user_id bigint NOT NULL REFERENCES tasks_user (id) DEFERRABLE INITIALLY DEFERRED,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    archived_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+PARTITIONED_INDEX_SQL = 'CREATE INDEX archivedtask_user_created_idx ON tasks_archivedtask (user_id, created_at, id)'
+VIEW_SQL = """
+CREATE VIEW tasks_taskwitharchive AS
+SELECT id, title, description, status, user_id, created_at, updated_at, FALSE AS archived FROM tasks_task
+UNION ALL
+SELECT id, title, description, status, user_id, created_at, updated_at, TRUE AS archived FROM tasks_archivedtask
+"""
+
+
+def create_archive(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # Partitions (one per month of created_at) are added by tasks.archive as tasks are archived.
+        schema_editor.execute(PARTITIONED_TABLE_SQL)
+        schema_editor.execute(PARTITIONED_INDEX_SQL)
+    else:
+        schema_editor.create_model(apps.get_model('tasks', 'ArchivedTask'))
+    schema_editor.execute(VIEW_SQL)
+
+
+def drop_archive(apps, schema_editor):
+    schema_editor.execute('DROP VIEW IF EXISTS tasks_taskwitharchive')
+    schema_editor.execute('DROP TABLE IF EXISTS tasks_archivedtask')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskWithArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('New', 'New'), ('In Progress', 'In Progress'), ('Completed', 'Completed'), ('Pending', 'Pending')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'tasks_taskwitharchive',
+                'managed': False,
+            },
+        ),
+        # The table itself is created by create_archive: partitioned on PostgreSQL.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedTask',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('title', models.CharField(max_length=255)),
+                        ('description', models.TextField(blank=True)),
+                        ('status', models.CharField(choices=[('New', 'New'), ('In Progress', 'In Progress'), ('Completed', 'Completed'), ('Pending', 'Pending')], max_length=20)),
+                        ('created_at', models.DateTimeField()),
+                        ('updated_at', models.DateTimeField()),
+                        ('archived_at', models.DateTimeField()),
+                        ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'created_at', 'id'], name='archivedtask_user_created_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive, drop_archive),
+    ]
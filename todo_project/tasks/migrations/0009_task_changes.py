@@ -0,0 +1,140 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+
+# Every insert and update of a task takes the next change_seq and every delete leaves a tombstone,
+# whichever path wrote it (ORM, QuerySet.update()/delete(), raw SQL, user cascades, archiving).
+# On PostgreSQL change_seq is the writing transaction's id: GET /api/tasks/changes/ only serves
+# rows of transactions older than every one still running, so a late commit is never skipped.
+# SQLite serializes writers, so a counter row is enough.
+POSTGRES_SQL = [
+    """
+    CREATE FUNCTION tasks_task_change_seq() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.change_seq := pg_current_xact_id()::text::bigint;
+        RETURN NEW;
+    END $$
+    """,
+    """
+    CREATE FUNCTION tasks_tasktombstone_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO tasks_tasktombstone (task_id, user_id, change_seq, deleted_at)
+        SELECT id, user_id, pg_current_xact_id()::text::bigint, now() FROM old_rows;
+        RETURN NULL;
+    END $$
+    """,
+    'CREATE TRIGGER tasks_task_change_seq BEFORE INSERT OR UPDATE ON tasks_task '
+    'FOR EACH ROW EXECUTE PROCEDURE tasks_task_change_seq()',
+    'CREATE TRIGGER tasks_tasktombstone_insert AFTER DELETE ON tasks_task REFERENCING OLD TABLE AS old_rows '
+    'FOR EACH STATEMENT EXECUTE PROCEDURE tasks_tasktombstone_insert()',
+]
+POSTGRES_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_task_change_seq ON tasks_task',
+    'DROP TRIGGER IF EXISTS tasks_tasktombstone_insert ON tasks_task',
+    'DROP FUNCTION IF EXISTS tasks_task_change_seq()',
+    'DROP FUNCTION IF EXISTS tasks_tasktombstone_insert()',
+]
+SQLITE_SQL = [
+    'CREATE TABLE tasks_changecounter (value integer NOT NULL)',
+    'INSERT INTO tasks_changecounter (value) VALUES (0)',
+    """
+    CREATE TRIGGER tasks_task_change_seq_insert AFTER INSERT ON tasks_task BEGIN
+        UPDATE tasks_changecounter SET value = value + 1;
+        UPDATE tasks_task SET change_seq = (SELECT value FROM tasks_changecounter) WHERE id = NEW.id;
+    END
+    """,
+    # change_seq itself is left out of the column list, so the trigger's own UPDATE does not fire it.
+    """
+    CREATE TRIGGER tasks_task_change_seq_update
+    AFTER UPDATE OF title, description, status, user_id, created_at, updated_at ON tasks_task BEGIN
+        UPDATE tasks_changecounter SET value = value + 1;
+        UPDATE tasks_task SET change_seq = (SELECT value FROM tasks_changecounter) WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_tasktombstone_insert AFTER DELETE ON tasks_task BEGIN
+        UPDATE tasks_changecounter SET value = value + 1;
+        INSERT INTO tasks_tasktombstone (task_id, user_id, change_seq, deleted_at)
+        VALUES (OLD.id, OLD.user_id, (SELECT value FROM tasks_changecounter), strftime('%Y-%m-%d %H:%M:%f', 'now'));
+    END
+    """,
+]
+SQLITE_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_task_change_seq_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_change_seq_update',
+    'DROP TRIGGER IF EXISTS tasks_tasktombstone_insert',
+    'DROP TABLE IF EXISTS tasks_changecounter',
+]
+
+
+def add_change_seq(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        # SQLite's add_field rebuilds the table, which would drop the stats triggers and break the archive view.
+        schema_editor.execute('ALTER TABLE tasks_task ADD COLUMN change_seq bigint DEFAULT 0 NOT NULL')
+        return
+    Task = apps.get_model('tasks', 'Task')
+    schema_editor.add_field(Task, Task._meta.get_field('change_seq'))
+
+
+def remove_change_seq(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('ALTER TABLE tasks_task DROP COLUMN change_seq')
+        return
+    Task = apps.get_model('tasks', 'Task')
+    schema_editor.remove_field(Task, Task._meta.get_field('change_seq'))
+
+
+def create_triggers(apps, schema_editor):
+    # Existing tasks keep change_seq 0: they are all returned by a first sync without ?since=.
+    statements = {'postgresql': POSTGRES_SQL, 'sqlite': SQLITE_SQL}.get(schema_editor.connection.vendor)
+    for sql in statements or []:
+        schema_editor.execute(sql)
+
+
+def drop_triggers(apps, schema_editor):
+    for sql in {'postgresql': POSTGRES_DROP_SQL, 'sqlite': SQLITE_DROP_SQL}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='task',
+                    name='change_seq',
+                    field=models.BigIntegerField(db_default=0, default=0, editable=False),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_change_seq, remove_change_seq),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'change_seq', 'id'], name='task_user_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['user_id', 'change_seq', 'task_id'], name='tombstone_user_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -13,6 +13,14 @@ class Task(models.Model):
         ('Completed', 'Completed'),
         ('Pending', 'Pending'),
     ]
+    # Allowed status changes: target -> statuses it can be reached from.
+    # A completed task can only be reopened as 'In Progress'.
+    TRANSITIONS = {
+        'New': ('In Progress', 'Pending'),
+        'In Progress': ('New', 'Pending', 'Completed'),
+        'Pending': ('New', 'In Progress'),
+        'Completed': ('New', 'In Progress', 'Pending'),
+    }
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -20,6 +28,131 @@ class Task(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Position in the changes feed, set by a trigger on every insert and update (migration 0009).
+    change_seq = models.BigIntegerField(default=0, db_default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: WHERE user_id = ? [AND status = ?] ORDER BY created_at, id
+            models.Index(fields=['user', 'status', 'created_at', 'id'], name='task_user_status_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='task_user_created_idx'),
+            # updated_at ranges and ?ordering=[-]updated_at (tasks.filters.TaskFilter)
+            models.Index(fields=['user', 'status', 'updated_at', 'id'], name='task_user_status_updated_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_idx'),
+            # Changes feed: WHERE user_id = ? AND (change_seq, id) > (?, ?) ORDER BY change_seq, id
+            models.Index(fields=['user', 'change_seq', 'id'], name='task_user_change_seq_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class TaskStat(models.Model):
+    # Task counts per (user, status). Maintained by triggers on tasks_task (migration 0007), so every
+    # write path is counted in the writing transaction: ORM saves, QuerySet.update()/delete(),
+    # raw SQL and COPY. manage.py rebuild_task_stats reconciles drift.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_stats')
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'status'], name='taskstat_user_status_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.status}: {self.count}'
+
+
+class TaskTombstone(models.Model):
+    # One row per deleted task, written by a trigger on tasks_task (migration 0009), so deletes from
+    # the API, QuerySet.delete(), user cascades and archiving all reach the changes feed.
+    # user_id has no foreign key: tombstones outlive the user. manage.py compact_tombstones
+    # removes those older than TASKS_TOMBSTONE_RETENTION_DAYS.
+    task_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'change_seq', 'task_id'], name='tombstone_user_change_seq_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} deleted at {self.deleted_at}'
+
+
+class ArchivedTask(models.Model):
+    # Completed tasks moved out of tasks_task by manage.py archive_tasks; ids are kept so that a task
+    # can be restored under the same id. On PostgreSQL the table is range-partitioned by month of
+    # created_at, with primary key (id, created_at); see migration 0008.
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks', db_index=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='archivedtask_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class TaskWithArchive(models.Model):
+    # Read-only view over tasks_task UNION ALL tasks_archivedtask, for ?include_archived=true.
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_taskwitharchive'
+
+    def __str__(self):
+        return self.title
+
+
+class UserDeletion(models.Model):
+    # Queue of users whose tasks are purged in the background by manage.py process_deletions (tasks.deletion).
+    # user_id has no foreign key: the job outlives the user and records what was deleted.
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    user_id = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    deleted_tasks = models.BigIntegerField(default=0)
+    deleted_archived_tasks = models.BigIntegerField(default=0)
+    batches = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    worker = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='userdeletion_status_idx'),
+        ]
+        constraints = [
+            # One open job per user: deleting a user twice does not queue a second purge.
+            models.UniqueConstraint(
+                fields=['user_id'], condition=models.Q(status__in=['pending', 'running']),
+                name='userdeletion_open_user_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.status}'
@@ -0,0 +1,12 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.openapi import AutoSchema
+
+# DEFAULT_SCHEMA_CLASS points here, so the extension below is registered whenever a schema is generated
+# (API view, manage.py spectacular/build_schema, the deploy check) and never at worker start-up.
+__all__ = ['AutoSchema']
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # The same bearer scheme as JWTAuthentication, for tasks.authentication's subclasses of it.
+    target_class = 'tasks.authentication.CachedJWTAuthentication'
+    match_subclasses = True
@@ -0,0 +1,167 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import ORDERINGS
+from .search import TaskSearchFilter
+
+DEFAULT_ORDERING_KEY = 'created_at'
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset pagination over the list's ordering (tasks.filters.ORDERINGS, ``?ordering=``, by
+    default (created_at, id)).
+
+    The cursor holds the ordering and the boundary row's sort key, so every page is an index
+    range scan on (user, [status,] <field>, id) and neither COUNT(*) nor OFFSET is executed.
+    """
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = request.query_params.get(self.ordering_query_param)
+        if self.ordering not in ORDERINGS:
+            self.ordering = DEFAULT_ORDERING_KEY  # anything else was rejected by TaskFilter
+        self.field = self.ordering.lstrip('-')
+        position, reverse = self.decode_cursor(request)
+
+        # Rows after the cursor in the requested direction, or before it for a previous page.
+        ascending = self.ordering.startswith('-') == reverse
+        if position is not None:
+            value, pk = position
+            # Row comparison on (<field>, id), spelled so the field alone bounds the index range.
+            if ascending:
+                queryset = queryset.filter(
+                    Q(**{f'{self.field}__gte': value}), Q(**{f'{self.field}__gt': value}) | Q(id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{self.field}__lte': value}), Q(**{f'{self.field}__lt': value}) | Q(id__lt=pk)
+                )
+        ordering = (self.field, 'id') if ascending else (f'-{self.field}', '-id')
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows:
+            if has_more or reverse:
+                self.next_position = self.row_position(rows[-1])
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_position = self.row_position(rows[0])
+        return rows
+
+    def row_position(self, row):
+        # Rows are model instances or values() dicts.
+        if isinstance(row, dict):
+            return row[self.field], row['id']
+        return getattr(row, self.field), row.id
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position, False))
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.previous_position, True))
+
+    def encode_cursor(self, position, reverse):
+        value, pk = position
+        raw = f'{value.isoformat()}|{pk}|{int(reverse)}|{self.ordering}'
+        return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            timestamp, pk, reverse, *ordering = raw.split('|')
+            value = parse_datetime(timestamp)
+            pk, reverse = int(pk), bool(int(reverse))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Cursors issued before orderings were supported carry none: they are (created_at, id) positions.
+        if value is None or (ordering or [DEFAULT_ORDERING_KEY]) != [self.ordering]:
+            raise NotFound(self.invalid_cursor_message)
+        return (value, pk), reverse
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'The pagination cursor value.',
+            'schema': {'type': 'string'},
+        }]
+
+
+class TaskPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination when the client opts in
+    with ``?pagination=cursor`` (or follows a ``cursor`` link).
+    """
+    mode_query_param = 'pagination'
+    keyset_class = TaskKeysetPagination
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return params.get(self.mode_query_param) == 'cursor' or self.keyset_class.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_class() if self.use_keyset(request) else None
+        if self.keyset is not None:
+            search_param = TaskSearchFilter.search_param
+            if request.query_params.get(search_param, '').strip():
+                # The cursor is keyed on the list's ordering, which would replace the ranking.
+                raise ValidationError({search_param: ['Search results cannot be paginated with a cursor.']})
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to "cursor" for keyset pagination in the list\'s ordering.',
+            'schema': {'type': 'string', 'enum': ['cursor']},
+        }] + self.keyset_class().get_schema_operation_parameters(view)
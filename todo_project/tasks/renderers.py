@@ -0,0 +1,59 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: FAST_JSON needs it
+    orjson = None
+
+ORJSON_OPTIONS = 0 if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+# orjson reads integers beyond 64 bits as floats; bodies with such long digit runs go to JSONParser.
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, byte for byte the same output as DRF's compact, UTF-8 default.
+
+    Dates, times, decimals, lazy strings and the rest go through DRF's own JSONEncoder.default;
+    pretty-printed output (``; indent=``, browsable API), non-default UNICODE_JSON/COMPACT_JSON/
+    STRICT_JSON and anything orjson rejects (NaN, integers beyond 64 bits) use JSONRenderer
+    itself. One difference remains: floats written in exponent notation lose the '+' and
+    leading zeros of the exponent (1e16, not 1e+16); the task API has no float fields.
+    """
+    default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (self.get_indent(accepted_media_type, renderer_context or {}) is not None
+                or self.ensure_ascii or not self.compact or not self.strict):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: keeps the output a strict JavaScript subset.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson for UTF-8 bodies; anything orjson rejects or may read differently goes to JSONParser."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,59 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'db:primary:{}'
+
+# Alias chosen for the current request's reads; None means the primary.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def pin_to_primary(user_id):
+    """Send the user's reads to the primary for DATABASE_REPLICA_PIN_SECONDS (read-your-writes)."""
+    cache.set(PIN_KEY.format(user_id), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return cache.get(PIN_KEY.format(user_id), False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to ``default``. Reads go to a replica only inside a view that opted in with
+    ReplicaReadMixin, for a safe method and a user who has not written recently.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+class ReplicaReadMixin:
+    """For API views whose GET/HEAD/OPTIONS requests may be answered from a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # authentication runs against the primary
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return
+        if request.method not in SAFE_METHODS:
+            # Pinned before the write, so no read can reach a replica that has not caught up with it.
+            pin_to_primary(request.user.pk)
+        elif not is_pinned(request.user.pk):
+            _read_alias.set(random.choice(replicas))
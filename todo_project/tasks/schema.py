@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import threading
+from importlib import import_module
+from pathlib import Path
+
+import drf_spectacular
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+
+try:
+    import brotli
+except ImportError:  # optional: without it the schema is served gzip-compressed only
+    brotli = None
+
+# Modules the schema is generated from, besides the URLconf; a change to any of them changes the fingerprint.
+SOURCES = (
+    'tasks.models', 'tasks.serializers', 'tasks.views', 'tasks.async_views', 'tasks.filters', 'tasks.pagination',
+    'tasks.openapi',
+)
+RENDERERS = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+
+def fingerprint():
+    """Hash of the URLconf, SOURCES and the drf-spectacular version: names one build of the schema."""
+    digest = hashlib.sha256(drf_spectacular.__version__.encode())
+    for name in (settings.ROOT_URLCONF, *SOURCES):
+        digest.update(Path(import_module(name).__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_schema():
+    """The schema rendered once per format: {'yaml': bytes, 'json': bytes}."""
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return {fmt: renderer().render(schema, renderer_context={}) for fmt, renderer in RENDERERS.items()}
+
+
+class SchemaDocument:
+    """One rendering of the schema with its compressed variants, as (body, ETag) per content encoding."""
+
+    def __init__(self, body):
+        etag = hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {'identity': (body, f'"{etag}"'), 'gzip': (gzip.compress(body, 9, mtime=0), f'"{etag}-gz"')}
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body), f'"{etag}-br"')
+
+    def pick(self, accept_encoding):
+        accepted = {value.split(';')[0].strip() for value in accept_encoding.split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return encoding
+        return 'identity'
+
+
+class SchemaCache:
+    """
+    The rendered schema for the current fingerprint, kept in memory. It is loaded from the files
+    written by ``manage.py build_schema`` if they match, otherwise generated once on first use.
+    With DEBUG on, the fingerprint is checked on every request and the schema rebuilt when it changes.
+    """
+
+    def __init__(self):
+        self.fingerprint = None
+        self.documents = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(fingerprint, {format: SchemaDocument})."""
+        if self.documents is None or settings.DEBUG:
+            with self._lock:
+                current = fingerprint() if settings.DEBUG or self.fingerprint is None else self.fingerprint
+                if self.documents is None or current != self.fingerprint:
+                    self.documents = {
+                        fmt: SchemaDocument(body) for fmt, body in (load(current) or build_schema()).items()
+                    }
+                    self.fingerprint = current
+        return self.fingerprint, self.documents
+
+    def clear(self):
+        with self._lock:
+            self.fingerprint = self.documents = None
+
+
+schema_cache = SchemaCache()
+
+
+def schema_path(fp, fmt, directory=None):
+    return Path(directory or settings.API_SCHEMA_DIR) / f'openapi-{fp}.{fmt}'
+
+
+def load(fp):
+    try:
+        return {fmt: schema_path(fp, fmt).read_bytes() for fmt in RENDERERS}
+    except FileNotFoundError:
+        return None
+
+
+def write(directory=None):
+    """Build the schema and store it under the current fingerprint; returns (fingerprint, {format: path})."""
+    fp = fingerprint()
+    paths = {}
+    for fmt, body in build_schema().items():
+        path = paths[fmt] = schema_path(fp, fmt, directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+    return fp, paths
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    /api/schema/ from SchemaCache: already serialized and compressed, with an ETag. Under
+    ``?v=<fingerprint>`` (the URL the docs pages use) it may be cached for good.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+        fp, documents = schema_cache.get()
+        document = documents[request.accepted_renderer.format]
+        encoding = document.pick(request.headers.get('Accept-Encoding', ''))
+        body, etag = document.variants[encoding]
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(body, content_type=request.accepted_media_type)
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Cache-Control'] = IMMUTABLE if request.GET.get('v') == fp else REVALIDATE
+        response['Vary'] = 'Accept, Accept-Encoding'
+        return response
+
+
+class FingerprintedSchemaURLMixin:
+    def _get_schema_url(self, request):
+        fp, _ = schema_cache.get()
+        return set_query_parameters(super()._get_schema_url(request), v=fp)
+
+
+class CachedSwaggerView(FingerprintedSchemaURLMixin, SpectacularSwaggerView):
+    pass
+
+
+class CachedRedocView(FingerprintedSchemaURLMixin, SpectacularRedocView):
+    pass
@@ -0,0 +1,70 @@
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+# Must match the expression of the GIN index created in migration 0006 character for character,
+# otherwise PostgreSQL will not use the index.
+SEARCH_CONFIG = 'simple'
+MAX_TERMS = 8
+
+
+def document_sql(table):
+    return (
+        f"to_tsvector('{SEARCH_CONFIG}', coalesce(\"{table}\".\"title\", '') || ' ' || "
+        f"coalesce(\"{table}\".\"description\", ''))"
+    )
+
+
+DOCUMENT_SQL = document_sql('tasks_task')
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def search_tasks(queryset, query):
+    """Filter tasks matching every term of ``query`` (as a prefix) and annotate a ``rank``."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+    if connections[queryset.db].vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        tsquery_sql = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        document = document_sql(queryset.model._meta.db_table)  # tasks_task, or the archive view
+        return queryset.filter(
+            RawSQL(f'{document} @@ {tsquery_sql}', [tsquery], output_field=BooleanField())
+        ).annotate(
+            rank=RawSQL(f'ts_rank({document}, {tsquery_sql})', [tsquery], output_field=FloatField())
+        )
+
+    # Portable fallback (SQLite in tests): LIKE on both columns, title matches ranked first.
+    matches = [Q(title__icontains=term) | Q(description__icontains=term) for term in terms]
+    in_title = reduce(and_, [Q(title__icontains=term) for term in terms])
+    return queryset.filter(*matches).annotate(
+        rank=Case(When(in_title, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+    )
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_tasks(queryset, query).order_by('-rank', '-id')
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over title and description; every word is matched as a prefix.',
+            'schema': {'type': 'string'},
+        }]
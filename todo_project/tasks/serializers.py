@@ -1,10 +1,18 @@
 from rest_framework import serializers
-from .models import User, Task
-from django.contrib.auth.password_validation import validate_password
+from .models import User, Task, UserDeletion
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .hashing import hash_password, run_password_validators
+from .instrumentation import TimedSerializerMixin
 
+BULK_MAX_ITEMS = 1000
 
-class UserSerializer(serializers.ModelSerializer):
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=6)
     first_name = serializers.CharField(required=True)
 
@@ -18,7 +26,7 @@ class UserSerializer(serializers.ModelSerializer):
     def validate_password(self, value):
         user = User(username=self.initial_data.get('username'))
         try:
-            validate_password(value, user)
+            run_password_validators(value, user)
         except ValidationError as e:
             raise serializers.ValidationError(e.messages)
         return value
@@ -26,17 +34,33 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         password = validated_data.pop('password')
         user = User(**validated_data)
-        user.set_password(password)
+        user.password = hash_password(password)  # hashed on the password pool, not the request thread
         user.save()
         return user
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class UserDeletionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = UserDeletion
+        fields = ['id', 'user_id', 'status', 'deleted_tasks', 'deleted_archived_tasks', 'requested_at', 'finished_at']
+        read_only_fields = fields
+
+
+class TokenObtainPairWithUsernameSerializer(TimedSerializerMixin, TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        return token
+
+
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
 
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'user', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
 
     def validate_status(self, value):
         allowed_statuses = [choice[0] for choice in Task.STATUS_CHOICES]
@@ -47,4 +71,14 @@ class TaskSerializer(serializers.ModelSerializer):
     def validate_title(self, value):
         if not value.strip():
             raise serializers.ValidationError("Title cannot be empty or whitespace")
-        return value
\ No newline at end of file
+        return value
+
+
+class TaskIdsSerializer(TimedSerializerMixin, serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+
+
+class TaskTransitionSerializer(TimedSerializerMixin, serializers.Serializer):
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
@@ -0,0 +1,163 @@
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('tasks.startup')
+
+# Requests most workers serve first; their URL patterns, views and serializers are prepared by warmup().
+WARMUP_PATHS = ('/api/tasks/', '/api/tasks/1/', '/api/register/', '/api/token/', '/api/token/refresh/')
+
+
+class LazyView:
+    """
+    URLconf entry for a class-based view imported on first request, for views most workers
+    never serve (API docs). ``view_class`` is not forwarded, so the resolver can build its
+    lookup strings from ``path`` without importing the view.
+    """
+
+    def __init__(self, path, **initkwargs):
+        self.path = path
+        self.initkwargs = initkwargs
+        self.__module__, _, self.__name__ = path.rpartition('.')
+        self.__qualname__ = self.__name__
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        if name == 'view_class' or name.startswith('__'):
+            raise AttributeError(name)
+        if name == 'view':
+            from django.utils.module_loading import import_string
+            self.view = import_string(self.path).as_view(**self.initkwargs)
+            return self.view
+        return getattr(self.view, name)  # csrf_exempt, cls, ...
+
+
+def _host():
+    from django.conf import settings
+    return next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+
+
+def call(handler, path, **headers):
+    """Run one GET through a WSGI handler in-process; returns the status code."""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'SERVER_NAME': _host(), 'SERVER_PORT': '443', 'HTTP_HOST': _host(), 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.url_scheme': 'https', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.version': (1, 0),
+        'wsgi.multithread': False, 'wsgi.multiprocess': True, 'wsgi.run_once': False, **headers,
+    }
+    statuses = []
+    response = handler(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+def warmup(close_connections=False):
+    """
+    Do what the first request of a new worker would otherwise pay for: compile the URL patterns
+    of WARMUP_PATHS, build their serializers' fields, send one unauthenticated request through
+    the middleware and DRF (imports, translations, renderers; not counted in the request metrics)
+    and connect to every database.
+    Returns the milliseconds spent per step.
+
+    Connections belong to the calling thread: pass ``close_connections`` when that thread will
+    not serve requests (with DB_POOL the pool keeps them).
+
+    Warmup never fails the worker: a step that raises, or a database that cannot be reached,
+    is logged and skipped, and the first request pays for it as it would without warmup.
+    """
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from django.urls import Resolver404, resolve
+
+    from .instrumentation import SKIP_METRICS
+
+    timings = {}
+
+    @contextmanager
+    def step(name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            logger.warning('Warmup step "%s" failed; skipped.', name, exc_info=True)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    with step('urls'):
+        views = set()
+        for path in WARMUP_PATHS:
+            try:
+                views.add(getattr(resolve(path).func, 'cls', None))
+            except Resolver404:
+                pass
+    with step('serializers'):
+        for view in views:
+            if hasattr(view, 'get_serializer_class'):
+                view().get_serializer_class()().fields
+    with step('request'):
+        request_log = logging.getLogger('django.request')
+        disabled, request_log.disabled = request_log.disabled, True  # no "Unauthorized" warning at every start
+        try:
+            call(WSGIHandler(), WARMUP_PATHS[0], **{SKIP_METRICS: True})
+        finally:
+            request_log.disabled = disabled
+    with step('databases'):
+        for alias in connections:
+            try:
+                connections[alias].ensure_connection()
+            except Exception:
+                logger.warning('Warmup could not connect to database "%s"; skipped.', alias, exc_info=True)
+            if close_connections:
+                connections[alias].close()
+    logger.info('Worker warmed up in %.1f ms: %s', sum(timings.values()), timings)
+    return timings
+
+
+def warmup_in_thread():
+    """warmup() from a plain thread, for ASGI servers that import the application inside their event loop."""
+    thread = threading.Thread(target=warmup, kwargs={'close_connections': True})
+    thread.start()
+    thread.join()
+
+
+def profile_child(warm, authorization=None):
+    """
+    One cold start, timed phase by phase, for manage.py startup_profile (run with ``python -X importtime``
+    in a fresh interpreter). Prints the timings as JSON.
+    """
+    phases = {}
+    start = time.perf_counter()
+
+    def mark(name):
+        nonlocal start
+        now = time.perf_counter()
+        phases[name] = round((now - start) * 1000, 1)
+        start = now
+
+    import django
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    mark('settings')
+    django.setup(set_prefix=False)
+    mark('setup')
+    from django.core.handlers.wsgi import WSGIHandler
+    handler = WSGIHandler()
+    mark('handler')
+    if warm:
+        warmup()
+        mark('warmup')
+    headers = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+    phases['first_status'] = call(handler, WARMUP_PATHS[0], **headers)
+    mark('first_request')
+    call(handler, WARMUP_PATHS[0], **headers)
+    mark('second_request')
+    print(json.dumps(phases))
@@ -0,0 +1,43 @@
+from django.db import connections, transaction
+from django.db.models import Count
+
+from .models import Task, TaskStat
+
+STATUSES = [choice[0] for choice in Task.STATUS_CHOICES]
+
+
+def task_stats(user_id):
+    """Counts per status for one user: one indexed read of at most len(STATUSES) rows."""
+    by_status = dict.fromkeys(STATUSES, 0)
+    by_status.update(TaskStat.objects.filter(user_id=user_id).values_list('status', 'count'))
+    return {'total': sum(by_status.values()), 'by_status': by_status}
+
+
+def rebuild_task_stats(user_ids=None, using='default'):
+    """
+    Recount tasks_taskstat from tasks_task and return the drift that was corrected
+    as ``{(user_id, status): (stored, actual)}``.
+    """
+    with transaction.atomic(using=using):
+        if connections[using].vendor == 'postgresql':
+            # Block task writes (reads go on) so nothing changes between the count and the rewrite.
+            with connections[using].cursor() as cursor:
+                cursor.execute('LOCK TABLE tasks_task IN SHARE MODE')
+        tasks = Task.objects.using(using).order_by()
+        stats = TaskStat.objects.using(using)
+        if user_ids is not None:
+            tasks, stats = tasks.filter(user_id__in=user_ids), stats.filter(user_id__in=user_ids)
+
+        actual = {(u, s): n for u, s, n in tasks.values_list('user_id', 'status').annotate(n=Count('id'))}
+        stored = {(u, s): n for u, s, n in stats.values_list('user_id', 'status', 'count')}
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in actual.keys() | stored.keys()
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        if drift:
+            stats.delete()
+            TaskStat.objects.using(using).bulk_create(
+                [TaskStat(user_id=u, status=s, count=n) for (u, s), n in actual.items()], batch_size=1000
+            )
+    return drift
@@ -1,8 +1,47 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import warnings
+from contextlib import suppress
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
-from .models import Task
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.db.models import Count
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from .models import ArchivedTask, Task, TaskStat, TaskTombstone, UserDeletion
+from .serializers import TaskSerializer
+from .transitions import task_etag
+from . import cache as task_cache
+from . import instrumentation
+from .authentication import TokenClaimsJWTAuthentication, user_cache
+from .routers import PIN_KEY
+from .hashing import password_pool
+from .changes import decode_cursor, encode_cursor
+from .events import hub
+from .filters import ORDERINGS, TaskFilter
+from .throttling import TokenBucketStore, bucket_store
+from . import schema as api_schema
+from .renderers import ORJSONParser, ORJSONRenderer
+from .deletion import UserPurger, claim_deletion, schedule_deletion
+from .views import TaskViewSet
+from .startup import LazyView, warmup
 
 User = get_user_model()
 
@@ -233,3 +272,1485 @@ class TaskTests(APITestCase):
        url = reverse('tasks-mark-completed', args=[self.task3.id])  # task3 принадлежит user2
        response = self.client.post(url)
        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TaskBulkTests(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username='user1', password='pass1234')
+        self.user2 = User.objects.create_user(username='user2', password='pass1234')
+        self.task1 = Task.objects.create(title='Task 1', status='New', user=self.user1)
+        self.task2 = Task.objects.create(title='Task 2', status='Pending', user=self.user1)
+        self.task3 = Task.objects.create(title='Task 3', status='New', user=self.user2)
+        self.client.force_authenticate(user=self.user1)
+        self.url = reverse('tasks-bulk')
+
+    def test_bulk_create(self):
+        data = [{'title': f'Bulk {i}', 'status': 'New'} for i in range(5)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertTrue(all(item['id'] and item['user'] == 'user1' for item in response.data))
+        self.assertEqual(Task.objects.filter(user=self.user1).count(), 7)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_bulk_create_reports_errors_per_item(self):
+        data = [{'title': 'Ok', 'status': 'New'}, {'title': ' ', 'status': 'Bad'}]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(0, response.data)
+        self.assertIn('title', response.data[1])
+        self.assertIn('status', response.data[1])
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_bulk_update(self):
+        data = [{'id': self.task1.id, 'status': 'In Progress'}, {'id': self.task2.id, 'title': 'Renamed'}]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task1.refresh_from_db()
+        self.task2.refresh_from_db()
+        self.assertEqual(self.task1.status, 'In Progress')
+        self.assertEqual(self.task2.title, 'Renamed')
+
+    def test_bulk_update_rejects_duplicate_ids(self):
+        data = [
+            {'id': self.task1.id, 'status': 'In Progress'},
+            {'id': self.task2.id, 'title': 'Renamed'},
+            {'id': self.task1.id, 'title': 'Twice'},
+        ]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {2: {'id': ['Duplicate id in this batch.']}})
+        self.task1.refresh_from_db()
+        self.assertEqual((self.task1.title, self.task1.status), ('Task 1', 'New'))
+
+    def test_bulk_update_rejects_ids_that_are_not_integers(self):
+        data = [{'id': True, 'title': 'Bool'}, {'id': str(self.task1.id)}, {'title': 'No id'}, {'id': 10 ** 20}]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        invalid = {'id': ['A valid integer is required.']}
+        self.assertEqual(response.data, {0: invalid, 1: invalid, 2: invalid, 3: {'id': ['Not found.']}})
+        self.task1.refresh_from_db()
+        self.assertEqual(self.task1.title, 'Task 1')
+
+    def test_bulk_update_foreign_task_is_not_found(self):
+        data = [{'id': self.task1.id, 'status': 'Completed'}, {'id': self.task3.id, 'status': 'Completed'}]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[1], {'id': ['Not found.']})
+        self.task1.refresh_from_db()
+        self.assertEqual(self.task1.status, 'New')
+
+    def test_bulk_delete(self):
+        response = self.client.delete(self.url, {'ids': [self.task1.id, self.task3.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.count(), 3)
+
+        response = self.client.delete(self.url, {'ids': [self.task1.id, self.task2.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(user=self.user1).exists())
+
+    def test_bulk_mark_completed(self):
+        url = reverse('tasks-bulk-mark-completed')
+        response = self.client.post(url, {'ids': [self.task1.id, self.task2.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['status'] for t in response.data], ['Completed', 'Completed'])
+        self.task3.refresh_from_db()
+        self.assertEqual(self.task3.status, 'New')
+
+
+class TaskKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='pass1234')
+        other = User.objects.create_user(username='other', password='pass1234')
+        Task.objects.bulk_create(
+            [Task(title=f'Task {i}', status='New' if i % 2 else 'Pending', user=self.user) for i in range(25)]
+            + [Task(title='Foreign', user=other)]
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-list')
+
+    def walk(self, url, params=None, link='next'):
+        ids, response = [], self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [task['id'] for task in response.data['results']]
+            if not response.data[link]:
+                return ids, response
+            response = self.client.get(response.data[link])
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(self.url)
+        self.assertIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_cursor_mode_walks_all_rows_in_order(self):
+        expected = list(Task.objects.filter(user=self.user).order_by('created_at', 'id').values_list('id', flat=True))
+        ids, last = self.walk(self.url, {'pagination': 'cursor'})
+        self.assertEqual(ids, expected)
+        self.assertNotIn('count', last.data)
+
+        back, _ = self.walk(last.data['previous'], link='previous')
+        self.assertEqual(sorted(back), expected[:20])
+
+    def test_cursor_mode_with_status_filter(self):
+        ids, _ = self.walk(self.url, {'pagination': 'cursor', 'status': 'New'})
+        self.assertEqual(len(ids), 12)
+
+    def test_cursor_mode_follows_ordering(self):
+        now = timezone.now()
+        for i, task in enumerate(Task.objects.filter(user=self.user).order_by('id')):
+            # Ties on updated_at are broken by id.
+            Task.objects.filter(pk=task.pk).update(updated_at=now - timedelta(minutes=(i * 7) % 11))
+        for ordering in ('-updated_at', 'updated_at', '-created_at'):
+            expected = list(
+                Task.objects.filter(user=self.user).order_by(*ORDERINGS[ordering]).values_list('id', flat=True)
+            )
+            ids, last = self.walk(self.url, {'pagination': 'cursor', 'ordering': ordering})
+            self.assertEqual(ids, expected)
+            back, _ = self.walk(last.data['previous'], link='previous')
+            self.assertEqual(set(back), set(expected[:20]))
+
+        # A cursor only continues the ordering it was issued for.
+        first = self.client.get(self.url, {'pagination': 'cursor', 'ordering': '-updated_at'})
+        response = self.client.get(first.data['next'].replace('ordering=-updated_at', 'ordering=updated_at'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deep_page_uses_composite_index(self):
+        first = self.client.get(self.url, {'pagination': 'cursor', 'status': 'New'})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data['next'])
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertFalse(any('COUNT(' in sql or 'OFFSET' in sql for sql in selects))
+
+        page_sql = next(sql for sql in selects if 'tasks_task' in sql)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + page_sql)
+            else:
+                cursor.execute('EXPLAIN QUERY PLAN ' + page_sql)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('task_user_status_created_idx', plan)
+
+
+class TaskResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        task_cache.stats.reset()
+        self.user = User.objects.create_user(username='poller', password='pass1234')
+        self.task = Task.objects.create(title='Cached', user=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-list')
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(task_cache.stats.snapshot(), {'hits': 1, 'misses': 1, 'not_modified': 0})
+
+    def test_if_none_match_returns_304_without_db_work(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_query_params_are_cached_separately(self):
+        all_tasks = self.client.get(self.url)
+        completed = self.client.get(self.url, {'status': 'Completed'})
+        self.assertNotEqual(all_tasks['ETag'], completed['ETag'])
+        self.assertEqual(completed.data['count'], 0)
+
+    def test_write_invalidates_cached_responses(self):
+        detail_url = reverse('tasks-detail', args=[self.task.id])
+        list_etag = self.client.get(self.url)['ETag']
+        detail_etag = self.client.get(detail_url)['ETag']
+
+        self.client.post(reverse('tasks-mark-completed', args=[self.task.id]))
+
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'Completed')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['status'], 'Completed')
+
+    def test_bulk_write_invalidates_cached_responses(self):
+        self.client.get(self.url)
+        self.client.post(reverse('tasks-bulk-mark-completed'), {'ids': [self.task.id]}, format='json')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['status'], 'Completed')
+
+
+class TaskSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='pass1234')
+        other = User.objects.create_user(username='other', password='pass1234')
+        self.report = Task.objects.create(title='Quarterly report', description='numbers for finance', user=self.user)
+        self.review = Task.objects.create(title='Code review', description='report on the parser', user=self.user)
+        Task.objects.create(title='Groceries', description='milk', user=self.user)
+        Task.objects.create(title='Quarterly report', user=other)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-list')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'search': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data['results']]
+
+    def test_search_matches_title_and_description_ranked(self):
+        self.assertEqual(self.search('report'), [self.report.id, self.review.id])
+
+    def test_search_matches_prefixes_of_every_term(self):
+        self.assertEqual(self.search('quart rep'), [self.report.id])
+        self.assertEqual(self.search('quart milk'), [])
+
+    def test_search_combines_with_status_filter(self):
+        self.assertEqual(self.search('report', status='Completed'), [])
+
+    def test_search_rejects_cursor_pagination(self):
+        response = self.client.get(self.url, {'search': 'report', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search', response.data)
+        self.assertEqual(self.search('report', page=1), [self.report.id, self.review.id])
+
+    def test_search_without_terms_matches_nothing(self):
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_search_index_expression_matches_query(self):
+        from importlib import import_module
+        from .search import DOCUMENT_SQL
+        migration = import_module('tasks.migrations.0006_task_search_index')
+        self.assertEqual(migration.DOCUMENT_SQL, DOCUMENT_SQL)
+
+
+class AsyncTaskApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='asyncuser', password='pass1234')
+        other = User.objects.create_user(username='other', password='pass1234')
+        self.task = Task.objects.create(title='Async task', status='New', user=self.user)
+        self.foreign = Task.objects.create(title='Foreign', user=other)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('async-tasks-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(reverse('async-tasks-list'), headers={'Authorization': 'Bearer bad'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_matches_sync_shape(self):
+        response = await self.async_client.get(reverse('async-tasks-list'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['user'], 'asyncuser')
+        self.assertEqual(set(data['results'][0]), {'id', 'title', 'description', 'status', 'user', 'created_at', 'updated_at'})
+
+    async def test_list_filters_and_orders_like_sync_list(self):
+        await Task.objects.acreate(title='Later', status='Pending', user=self.user)
+        client = APIClient(HTTP_AUTHORIZATION=self.headers['Authorization'])
+        for params in ({}, {'ordering': '-created_at'}, {'status': 'Pending'}, {'status__in': 'New,Pending'}):
+            response = await self.async_client.get(reverse('async-tasks-list'), params, headers=self.headers)
+            expected = await sync_to_async(client.get)(reverse('tasks-list'), params)
+            self.assertEqual(response.json()['results'], json.loads(expected.content)['results'])
+
+        for params in ({'status': 'Bogus'}, {'ordering': 'title'}):
+            response = await self.async_client.get(reverse('async-tasks-list'), params, headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            expected = await sync_to_async(client.get)(reverse('tasks-list'), params)
+            self.assertEqual(response.json(), json.loads(expected.content))
+
+    async def test_create_update_complete_delete(self):
+        url = reverse('async-tasks-list')
+        response = await self.async_client.post(url, {'title': ' '}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('title', response.json())
+
+        response = await self.async_client.post(url, {'title': 'New'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        detail = reverse('async-tasks-detail', args=[response.json()['id']])
+
+        response = await self.async_client.patch(
+            detail, {'status': 'In Progress'}, content_type='application/json', headers=self.headers
+        )
+        self.assertEqual(response.json()['status'], 'In Progress')
+
+        response = await self.async_client.post(
+            reverse('async-tasks-mark-completed', args=[response.json()['id']]), headers=self.headers
+        )
+        self.assertEqual(response.json()['status'], 'Completed')
+
+        response = await self.async_client.delete(detail, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Task.objects.filter(title='New').aexists())
+
+    async def test_foreign_task_is_not_found(self):
+        url = reverse('async-tasks-detail', args=[self.foreign.id])
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.delete(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='pass1234')
+        other = User.objects.create_user(username='other', password='pass1234')
+        Task.objects.create(title='First, "quoted"', description='line\nbreak', status='New', user=self.user)
+        Task.objects.create(title='Second', status='Completed', user=self.user)
+        Task.objects.create(title='Foreign', user=other)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-export')
+
+    def test_export_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ndjson_rows_match_serializer(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'format': 'ndjson'})
+            body = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = TaskSerializer(Task.objects.filter(user=self.user).order_by('created_at', 'id'), many=True).data
+        self.assertEqual(rows, json.loads(json.dumps(expected)))
+
+    def test_csv_export_with_status_filter(self):
+        response = self.client.get(self.url, {'format': 'csv', 'status': 'New'})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['id', 'title', 'description', 'status', 'user', 'created_at', 'updated_at'])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:5], ['First, "quoted"', 'line\nbreak', 'New', 'exporter'])
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='importer', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-import')
+
+    def test_ndjson_import_reports_bad_rows(self):
+        body = '\n'.join([
+            json.dumps({'title': 'One', 'status': 'Pending'}),
+            json.dumps({'title': '  '}),
+            'not json',
+            json.dumps({'title': 'Two', 'description': 'x', 'status': 'Bogus'}),
+            json.dumps({'title': ' Three '}),
+        ])
+        response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['total'], response.data['imported'], response.data['failed']), (5, 2, 3))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('status', response.data['errors'][2]['errors'])
+        self.assertEqual(
+            list(Task.objects.filter(user=self.user).order_by('id').values_list('title', 'status')),
+            [('One', 'Pending'), ('Three', 'New')],
+        )
+
+    def test_csv_import(self):
+        body = 'title,description,status\nFirst,"multi\nline",In Progress\nSecond,,\n'
+        response = self.client.generic('POST', self.url, body, content_type='text/csv')
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(Task.objects.get(title='First').description, 'multi\nline')
+        self.assertEqual(Task.objects.get(title='Second').status, 'New')
+
+    def test_invalid_utf8_rows_are_rejected(self):
+        body = '\ufeff{"title": "One"}\n'.encode() + b'{"title": "Bad \xff"}\n' + '{"title": "\ufeffTwo"}\n'.encode()
+        response = self.client.generic('POST', self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['imported'], response.data['failed']), (2, 1))
+        self.assertEqual(response.data['errors'][0], {'row': 2, 'errors': {'non_field_errors': ['Not valid UTF-8.']}})
+        # Only the first line's BOM is dropped.
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'One', '\ufeffTwo'})
+
+        body = b'title,description\nFirst,"multi\n\xffline"\nSecond,\n'
+        response = self.client.generic('POST', self.url, body, content_type='text/csv')
+        self.assertEqual((response.data['imported'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 3)
+
+    def test_unsupported_content_type(self):
+        response = self.client.generic('POST', self.url, '<tasks/>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as source:
+            source.write('title,status\nFrom file,Completed\n')
+        out = io.StringIO()
+        call_command('import_tasks', source.name, user='importer', stdout=out)
+        os.unlink(source.name)
+        self.assertEqual(json.loads(out.getvalue())['imported'], 1)
+        self.assertTrue(Task.objects.filter(user=self.user, title='From file', status='Completed').exists())
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='cached', password='StrongPass123!')
+        Task.objects.create(title='Task', user=self.user)
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        self.url = reverse('tasks-list')
+
+    def user_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params, HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in ctx.captured_queries if '"tasks_user"' in q['sql']], len(ctx.captured_queries)
+
+    def test_second_request_skips_user_lookup(self):
+        # Distinct query strings so the response cache does not hide the difference.
+        first, first_total = self.user_queries(page=1)
+        second, second_total = self.user_queries(status='New')
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertEqual(second_total, first_total - 1)
+
+    def test_saving_user_invalidates_entry(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.user_queries()
+        self.user.delete()
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_claims_mode_for_safe_methods(self):
+        token = self.client.post(
+            reverse('token_obtain_pair'), {'username': 'cached', 'password': 'StrongPass123!'}, format='json'
+        ).data['access']
+        factory = APIRequestFactory()
+        auth = TokenClaimsJWTAuthentication()
+
+        with self.assertNumQueries(0):
+            user, _ = auth.authenticate(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        self.assertEqual((str(user.pk), user.username), (str(self.user.pk), 'cached'))
+        self.assertNotIsInstance(user, User)
+
+        user, _ = auth.authenticate(factory.post('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        self.assertIsInstance(user, User)
+
+    def test_stats_and_changes_authenticate_from_token_claims(self):
+        user_cache.clear()
+        for name in ('tasks-stats', 'tasks-changes'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name), HTTP_AUTHORIZATION=self.auth)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse([q['sql'] for q in ctx.captured_queries if 'FROM "tasks_user"' in q['sql']])
+        self.assertEqual(self.client.get(reverse('tasks-stats'), HTTP_AUTHORIZATION=self.auth).data['total'], 1)
+        self.assertEqual(len(self.client.get(reverse('tasks-changes'), HTTP_AUTHORIZATION=self.auth).data['results']), 1)
+        self.assertEqual(self.client.get(reverse('tasks-stats')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskTransitionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mover', password='pass1234')
+        other = User.objects.create_user(username='other', password='pass1234')
+        self.task = Task.objects.create(title='Move me', status='New', user=self.user)
+        self.foreign = Task.objects.create(title='Foreign', status='New', user=other)
+        self.client.force_authenticate(user=self.user)
+
+    def transition(self, task, target, **headers):
+        return self.client.post(reverse('tasks-transition', args=[task.id]), {'status': target}, format='json', **headers)
+
+    def test_allowed_transition_is_a_single_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.transition(self.task, 'In Progress')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'In Progress')
+        self.assertEqual([q['sql'].split()[0] for q in ctx.captured_queries], ['UPDATE'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'In Progress')
+        self.assertEqual(response['ETag'], task_etag(self.task.pk, self.task.updated_at))
+
+    def test_disallowed_transition(self):
+        self.transition(self.task, 'Completed')
+        response = self.transition(self.task, 'Pending')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'Completed')
+
+    def test_invalid_target_and_foreign_task(self):
+        self.assertEqual(self.transition(self.task, 'Done').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.transition(self.foreign, 'Pending').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_if_match(self):
+        etag = self.client.get(reverse('tasks-detail', args=[self.task.id]))['ETag']
+        response = self.transition(self.task, 'Pending', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The old ETag is now stale.
+        response = self.transition(self.task, 'In Progress', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.post(reverse('tasks-mark-completed', args=[self.task.id]), HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'Pending')
+
+    def test_update_and_delete_with_stale_etag(self):
+        url = reverse('tasks-detail', args=[self.task.id])
+        etag = self.client.get(url)['ETag']
+        response = self.client.patch(url, {'title': 'First'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        fresh = response['ETag']
+
+        response = self.client.patch(url, {'title': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH=etag).status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH=fresh).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_malformed_ids_are_not_found(self):
+        for pk in ('abc', '99999999999999999999', '0'):
+            url = reverse('tasks-detail', args=[pk])
+            self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.post(reverse('tasks-transition', args=[pk]), {'status': 'Pending'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+
+
+class TaskReadPathTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pass1234')
+        Task.objects.bulk_create(
+            [Task(title=f'Read {i}', description=f'Body {i}', status='Pending', user=self.user) for i in range(15)]
+        )
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def expected(self, queryset):
+        return TaskSerializer(queryset.select_related('user'), many=True).data
+
+    def test_list_matches_serializer(self):
+        queryset = Task.objects.filter(user=self.user).order_by('created_at', 'id')
+        response = self.client.get(reverse('tasks-list'), {'pagination': 'cursor'})
+        self.assertEqual(response.data['results'], self.expected(queryset[:10]))
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], self.expected(queryset[10:]))
+        self.assertEqual(json.loads(response.content)['results'], json.loads(json.dumps(self.expected(queryset[10:]))))
+
+    def test_detail_matches_serializer(self):
+        task = Task.objects.filter(user=self.user).first()
+        response = self.client.get(reverse('tasks-detail', args=[task.id]))
+        self.assertEqual(response.data, TaskSerializer(task).data)
+        self.assertEqual(self.client.get(reverse('tasks-detail', args=[0])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('tasks-list'), {'search': 'read'})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(ctx.captured_queries), 2)  # COUNT(*) and the page, with the user joined
+        self.assertIn('JOIN', ctx.captured_queries[-1]['sql'])
+
+    def test_serialization_benchmark_command(self):
+        out = io.StringIO()
+        call_command('bench_serialization', rows=20, repeat=1, stdout=out)
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['values_encoder']['queries'], 1)
+        self.assertEqual(result['serializer']['queries'], 21)
+
+
+class TaskStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='counter', password='pass1234')
+        self.other = User.objects.create_user(username='other', password='pass1234')
+        Task.objects.create(title='Foreign', user=self.other)
+        self.client.force_authenticate(user=self.user)
+
+    def assertStatsMatchTasks(self):
+        expected = dict.fromkeys([choice[0] for choice in Task.STATUS_CHOICES], 0)
+        for row in Task.objects.filter(user=self.user).values('status').annotate(n=Count('id')).order_by():
+            expected[row['status']] = row['n']
+        with self.assertNumQueries(1):
+            data = self.client.get(reverse('tasks-stats')).data
+        self.assertEqual(data, {'total': sum(expected.values()), 'by_status': expected})
+
+    def test_counts_follow_every_write_path(self):
+        task = self.client.post(reverse('tasks-list'), {'title': 'One'}, format='json').data
+        self.client.post(reverse('tasks-bulk'), [{'title': f'Bulk {i}'} for i in range(4)], format='json')
+        self.client.post(reverse('tasks-import'), '{"title": "Imported", "status": "Pending"}\n',
+                         content_type='application/x-ndjson')
+        self.assertStatsMatchTasks()
+
+        self.client.post(reverse('tasks-transition', args=[task['id']]), {'status': 'In Progress'}, format='json')
+        ids = list(Task.objects.filter(user=self.user, status='New').values_list('id', flat=True))
+        self.client.post(reverse('tasks-mark-completed', args=[ids[0]]))
+        self.client.post(reverse('tasks-bulk-mark-completed'), {'ids': ids[1:3]}, format='json')
+        self.client.patch(reverse('tasks-detail', args=[ids[3]]), {'status': 'Pending'}, format='json')
+        self.assertStatsMatchTasks()
+
+        Task.objects.filter(user=self.user, status='Completed').update(status='New')
+        Task.objects.filter(user=self.user, status='Pending').delete()
+        self.client.delete(reverse('tasks-detail', args=[task['id']]))
+        self.assertStatsMatchTasks()
+        self.assertEqual(self.client.get(reverse('tasks-stats')).data['total'], 3)
+
+    def test_deleting_user_removes_stats(self):
+        self.other.delete()
+        self.assertFalse(TaskStat.objects.filter(user_id=self.other.pk).exists())
+
+    def test_rebuild_fixes_drift(self):
+        Task.objects.create(title='Mine', status='Pending', user=self.user)
+        TaskStat.objects.filter(user=self.user, status='Pending').update(count=7)
+        TaskStat.objects.create(user=self.user, status='Completed', count=2)
+
+        out = io.StringIO()
+        call_command('rebuild_task_stats', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['fixed'], 2)
+        self.assertStatsMatchTasks()
+
+        out = io.StringIO()
+        call_command('rebuild_task_stats', user=['counter'], stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['fixed'], 0)
+
+
+class BenchApiCommandTests(TestCase):
+    def test_reports_every_endpoint_and_rolls_back(self):
+        out = io.StringIO()
+        call_command('bench_api', users=3, tasks=4, requests=3, json_path='-', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['users'], 3)
+        self.assertEqual(set(report['results']), {
+            'register', 'token', 'task_create', 'task_list', 'task_list_filtered', 'task_detail',
+            'task_update', 'mark_completed', 'task_delete',
+        })
+        for summary in report['results'].values():
+            self.assertEqual(summary['requests'], 3)
+            self.assertIn('p99_ms', summary)
+            self.assertIn('queries_per_request', summary)
+        self.assertFalse(User.objects.filter(username__startswith='bench_api').exists())
+
+        out = io.StringIO()
+        call_command('bench_api', users=2, tasks=2, requests=1, stdout=out)
+        self.assertIn('mark_completed', out.getvalue())
+
+
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        for metric in instrumentation.METRICS:
+            metric.clear()
+        self.user = User.objects.create_user(username='metered', password='pass1234')
+        Task.objects.create(title='Task', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def timings(self, response):
+        return {part.split(';')[0]: part for part in response['Server-Timing'].split(', ')}
+
+    def test_server_timing_breakdown(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('tasks-list'), {'title': 'New'}, format='json')
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'db', 'serializer', 'auth', 'total'})
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', timings['db'])
+        self.assertNotEqual(timings['serializer'], 'serializer;dur=0.0')
+
+        client = APIClient(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertNotEqual(self.timings(client.get(reverse('tasks-list')))['auth'], 'auth;dur=0.0')
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('tasks-list'))
+        self.client.post(reverse('user-register'), {'username': 'x'}, format='json')
+        # Closed by default: a token or a staff session is needed.
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_login(User.objects.create_user(username='ops', password='pass1234', is_staff=True))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="TaskViewSet.list",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_db_queries_bucket{view="UserRegisterView",le="+Inf"} 1', body)
+        self.assertIn('# TYPE http_request_auth_seconds histogram', body)
+
+        self.client.logout()
+        with self.settings(REQUEST_METRICS={**settings.REQUEST_METRICS, 'TOKEN': 'secret'}):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_slow_request_log_and_sampling(self):
+        config = {**settings.REQUEST_METRICS, 'SAMPLE_RATE': 0.0, 'SLOW_REQUEST_MS': 0}
+        with self.settings(REQUEST_METRICS=config), self.assertLogs('tasks.requests', 'WARNING') as logs:
+            self.client = APIClient()  # middleware reads REQUEST_METRICS when the handler is built
+            self.client.force_authenticate(user=self.user)
+            response = self.client.get(reverse('tasks-detail', args=[Task.objects.get().pk]))
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn('view=TaskViewSet.retrieve', logs.output[0])
+        self.assertNotIn('db_queries', logs.records[0].request_metrics)
+        self.assertNotIn('TaskViewSet.retrieve', ''.join(instrumentation.DB_QUERIES.render()))
+
+
+@skipUnless({'replica_1', 'replica_2'} <= set(settings.DATABASES), 'needs todo_project.settings_test')
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingTests(APITestCase):
+    # The replica aliases are separate, empty databases here, so rows show where a read went.
+    databases = {'default', 'replica_1', 'replica_2'} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='routed', password='pass1234')
+        Task.objects.create(title='On primary', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def replica_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connections['replica_1']) as one, \
+                CaptureQueriesContext(connections['replica_2']) as two:
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, len(one.captured_queries) + len(two.captured_queries)
+
+    def test_safe_reads_go_to_a_replica(self):
+        response, queries = self.replica_queries('get', reverse('tasks-list'))
+        self.assertEqual(response.data['count'], 0)
+        self.assertGreater(queries, 0)
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        response, queries = self.replica_queries('post', reverse('tasks-list'), {'title': 'Second'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(queries, 0)
+
+        response, queries = self.replica_queries('get', reverse('tasks-list'))
+        self.assertEqual((response.data['count'], queries), (2, 0))
+
+        cache.delete(PIN_KEY.format(self.user.pk))  # the pin window has passed
+        response, queries = self.replica_queries('get', reverse('tasks-list'), {'page': 1})
+        self.assertEqual(response.data['count'], 0)
+        self.assertGreater(queries, 0)
+
+    def test_unrouted_views_and_writes_use_primary(self):
+        self.assertEqual(router.db_for_write(Task), 'default')
+        self.assertEqual(router.db_for_read(Task), 'default')
+        _, queries = self.replica_queries('get', reverse('async-tasks-list'))
+        self.assertEqual(queries, 0)
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1000
+
+
+class PasswordPoolTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hasher', password='StrongPass123!')
+        self.url = reverse('token_obtain_pair')
+
+    def test_login_and_registration_are_shed_when_pool_is_full(self):
+        with mock.patch.object(password_pool._slots, 'acquire', return_value=False):
+            response = self.client.post(self.url, {'username': 'hasher', 'password': 'StrongPass123!'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], str(password_pool.retry_after))
+
+            data = {'username': 'newbie', 'password': 'StrongPass123!', 'first_name': 'New'}
+            response = self.client.post(reverse('user-register'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.filter(username='newbie').exists())
+
+    def test_wrong_password_and_unknown_user(self):
+        for username, password in (('hasher', 'wrong'), ('nobody', 'StrongPass123!')):
+            response = self.client.post(self.url, {'username': username, 'password': password}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(PASSWORD_HASHERS=[
+        'tasks.tests.FastPBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_outdated_hash_is_upgraded_on_login(self):
+        self.assertTrue(self.user.password.startswith('md5$'))
+        response = self.client.post(self.url, {'username': 'hasher', 'password': 'StrongPass123!'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(self.user.check_password('StrongPass123!'))
+
+
+class TaskArchiveTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='archivist', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        old = timezone.now() - timedelta(days=400)
+        for i in range(5):
+            Task.objects.create(title=f'Old {i}', status='Completed', user=self.user)
+        Task.objects.create(title='Old but open', status='New', user=self.user)
+        Task.objects.create(title='Recent', status='Completed', user=self.user)
+        Task.objects.exclude(title='Recent').update(updated_at=old)
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command('archive_tasks', *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_archives_old_completed_tasks_in_resumable_batches(self):
+        report = self.archive('--batch-size', '2', '--max-batches', '1')
+        self.assertEqual((report['archived'], report['remaining']), (2, 3))
+        report = self.archive('--batch-size', '2')
+        self.assertEqual((report['archived'], report['batches'], report['remaining']), (3, 2, 0))
+
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Old but open', 'Recent'})
+        self.assertEqual(ArchivedTask.objects.filter(user=self.user, status='Completed').count(), 5)
+        self.assertEqual(self.client.get(reverse('tasks-stats')).data['total'], 2)
+
+    def test_list_with_archived_and_restore(self):
+        self.assertEqual(len(self.client.get(reverse('tasks-list')).data['results']), 7)
+        self.archive()
+        self.assertEqual(len(self.client.get(reverse('tasks-list')).data['results']), 2)
+
+        results = self.client.get(reverse('tasks-list'), {'include_archived': 'true'}).data['results']
+        self.assertEqual(len(results), 7)
+        archived = [task for task in results if task['archived']]
+        self.assertEqual(len(archived), 5)
+        self.assertEqual(archived[0]['user'], 'archivist')
+
+        response = self.client.post(reverse('tasks-restore', args=[archived[0]['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], archived[0]['title'])
+        self.assertTrue(Task.objects.filter(pk=archived[0]['id']).exists())
+        self.assertEqual(len(self.client.get(reverse('tasks-list')).data['results']), 3)
+        response = self.client.post(reverse('tasks-restore', args=[archived[0]['id']]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        other = User.objects.create_user(username='intruder', password='pass1234')
+        self.client.force_authenticate(user=other)
+        response = self.client.post(reverse('tasks-restore', args=[archived[1]['id']]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for pk in ('abc', '99999999999999999999'):
+            response = self.client.post(reverse('tasks-restore', args=[pk]))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        call_command('archive_tasks', '--restore', 'archivist', stdout=io.StringIO())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 7)
+
+    def test_restored_tasks_are_not_archived_again(self):
+        self.archive()
+        call_command('archive_tasks', '--restore', 'archivist', stdout=io.StringIO())
+        restored = Task.objects.get(title='Old 0')
+        self.assertGreater(restored.updated_at, timezone.now() - timedelta(minutes=1))
+        report = self.archive()
+        self.assertEqual((report['archived'], report['remaining']), (0, 0))
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 7)
+
+
+class TaskChangesTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='syncer', password='pass1234')
+        self.other = User.objects.create_user(username='other', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('tasks-changes')
+        self.tasks = [Task.objects.create(title=f'Task {i}', user=self.user) for i in range(3)]
+        Task.objects.create(title='Foreign', user=self.other)
+
+    def sync(self, cursor=None):
+        response = self.client.get(self.url, {'since': cursor} if cursor else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_only_changes_since_cursor_are_returned(self):
+        data = self.sync()
+        self.assertEqual([task['title'] for task in data['results']], ['Task 0', 'Task 1', 'Task 2'])
+        self.assertEqual((data['deleted'], data['has_more']), ([], False))
+        self.assertEqual(self.sync(data['cursor'])['results'], [])
+
+        cursor = data['cursor']
+        self.client.patch(reverse('tasks-detail', args=[self.tasks[1].pk]), {'title': 'Edited'}, format='json')
+        Task.objects.filter(pk=self.tasks[2].pk).update(status='Pending')
+        self.client.delete(reverse('tasks-detail', args=[self.tasks[0].pk]))
+        new = self.client.post(reverse('tasks-list'), {'title': 'New one'}, format='json').data
+        data = self.sync(cursor)
+        self.assertEqual([task['id'] for task in data['results']], [self.tasks[1].pk, self.tasks[2].pk, new['id']])
+        self.assertEqual(data['results'][0]['title'], 'Edited')
+        self.assertEqual(data['deleted'], [self.tasks[0].pk])
+        data = self.sync(data['cursor'])
+        self.assertEqual((data['results'], data['deleted']), ([], []))
+
+    def test_pages_and_cascade_tombstones(self):
+        cursor = self.sync()['cursor']
+        Task.objects.filter(user=self.user).update(description='changed')
+        seen = []
+        with mock.patch('tasks.changes.CHANGES_PAGE_SIZE', 2):
+            while True:
+                data = self.sync(cursor)
+                seen += [task['id'] for task in data['results']]
+                cursor = data['cursor']
+                if not data['has_more']:
+                    break
+        self.assertEqual(seen, [task.pk for task in self.tasks])
+
+        foreign, other_id = Task.objects.get(user=self.other).pk, self.other.pk
+        self.other.delete()
+        self.assertEqual(list(TaskTombstone.objects.filter(user_id=other_id).values_list('task_id', flat=True)),
+                         [foreign])
+        self.assertEqual(self.sync(cursor)['deleted'], [])
+
+    def test_expired_cursor_and_compaction(self):
+        self.tasks[0].delete()
+        expired = encode_cursor(0, 0, 0)
+        response = self.client.get(self.url, {'since': expired})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        response = self.client.get(self.url, {'since': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        TaskTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        out = io.StringIO()
+        call_command('compact_tombstones', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), {'deleted': 1})
+        self.assertFalse(TaskTombstone.objects.exists())
+
+
+@override_settings(TASK_EVENTS={**settings.TASK_EVENTS, 'HEARTBEAT_SECONDS': 0.05})
+class TaskEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='streamer', password='pass1234')
+        self.task = Task.objects.create(title='Existing', user=self.user)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.url = reverse('tasks-events')
+
+    @staticmethod
+    async def next_event(stream):
+        while True:
+            frame = (await anext(stream)).decode()
+            if not frame.startswith((':', 'retry:')):
+                return dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+
+    @staticmethod
+    async def disconnect(stream):
+        # What the ASGI handler does when the client goes away: cancel the task reading the stream.
+        reader = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        reader.cancel()
+        with suppress(asyncio.CancelledError):
+            await reader
+
+    async def test_changes_are_pushed_and_resumable(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry: '))
+        self.assertEqual(await anext(stream), b': ping\n\n')  # nothing before the connection is replayed
+
+        new = await Task.objects.acreate(title='Pushed', user=self.user)
+        await Task.objects.filter(pk=self.task.pk).aupdate(status='Completed')
+        hub.deliver(self.user.pk)
+        created = await self.next_event(stream)
+        self.assertEqual((created['event'], json.loads(created['data'])['title']), ('task.created', 'Pushed'))
+        completed = await self.next_event(stream)
+        self.assertEqual((completed['event'], json.loads(completed['data'])['id']), ('task.completed', self.task.pk))
+
+        await Task.objects.filter(pk=new.pk).adelete()
+        hub.deliver(self.user.pk)
+        deleted = await self.next_event(stream)
+        self.assertEqual((deleted['event'], json.loads(deleted['data'])), ('task.deleted', {'id': new.pk}))
+        await self.disconnect(stream)
+        self.assertEqual(hub.connections(self.user.pk), 0)
+
+        response = await self.async_client.get(self.url, headers={**self.headers, 'Last-Event-ID': created['id']})
+        stream = aiter(response.streaming_content)
+        resumed = [decode_cursor((await self.next_event(stream))['id'])[:2] for _ in range(2)]
+        self.assertEqual(resumed, [decode_cursor(completed['id'])[:2], decode_cursor(deleted['id'])[:2]])
+        await self.disconnect(stream)
+
+    async def test_authentication_cap_and_expired_cursor(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        streams = []
+        for _ in range(hub.max_per_user):
+            streams.append(aiter((await self.async_client.get(self.url, headers=self.headers)).streaming_content))
+            await anext(streams[-1])
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        for stream in streams:
+            await self.disconnect(stream)
+
+        response = await self.async_client.get(self.url, headers={**self.headers, 'Last-Event-ID': encode_cursor(0, 0, 0)})
+        stream = aiter(response.streaming_content)
+        self.assertEqual((await self.next_event(stream))['event'], 'reset')
+        await self.disconnect(stream)
+        self.assertEqual(hub.connections(self.user.pk), 0)
+
+    async def test_polls_release_the_database_connection(self):
+        with mock.patch('tasks.async_views.connection') as connection:
+            connection.in_atomic_block = False
+            response = await self.async_client.get(self.url, headers=self.headers)
+            stream = aiter(response.streaming_content)
+            await anext(stream)
+            self.assertEqual(connection.close.call_count, 1)  # head_position
+            self.assertEqual(await anext(stream), b': ping\n\n')
+            self.assertEqual(connection.close.call_count, 2)  # the first change_events poll
+            await self.disconnect(stream)
+
+    def test_commit_publishes_and_wsgi_is_rejected(self):
+        with mock.patch('tasks.events.publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Task.objects.create(title='Committed', user=self.user)
+        publish.assert_called_with(self.user.pk)
+        response = self.client.get(self.url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+
+class TaskFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='filterer', password='pass1234')
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        for days, task_status in ((30, 'New'), (10, 'In Progress'), (3, 'Completed'), (1, 'New'), (0, 'Pending')):
+            task = Task.objects.create(title=f'{task_status} {days}', status=task_status, user=self.user)
+            Task.objects.filter(pk=task.pk).update(updated_at=now - timedelta(days=days))
+        self.week_ago = (now - timedelta(days=7)).isoformat()
+
+    def titles(self, params):
+        response = self.client.get(reverse('tasks-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [task['title'] for task in response.data['results']]
+
+    def test_ranges_status_in_and_ordering(self):
+        self.assertEqual(self.titles({'updated_at__gte': self.week_ago, 'ordering': '-updated_at'}),
+                         ['Pending 0', 'New 1', 'Completed 3'])
+        self.assertEqual(self.titles({'status__in': 'New,In Progress', 'ordering': 'updated_at'}),
+                         ['New 30', 'In Progress 10', 'New 1'])
+        self.assertEqual(self.titles({'status__in': 'New', 'updated_at__lte': self.week_ago}), ['New 30'])
+        self.assertEqual(self.titles({'created_at__lte': self.week_ago}), [])
+        for params in ({'ordering': 'title'}, {'status__in': 'New,Bogus'}, {'updated_at__gte': 'yesterday'}):
+            response = self.client.get(reverse('tasks-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.titles({})
+        self.assertEqual([str(warning.message) for warning in caught], [])
+
+    def assertIndexBacked(self, params):
+        queryset = TaskFilter(params, queryset=Task.objects.filter(user=self.user).order_by('created_at', 'id')).qs
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')  # any remaining Seq Scan means no usable index
+            plan = queryset.explain()
+            self.assertNotIn('Seq Scan', plan, params)
+            if 'status__in' not in params:
+                self.assertNotIn('Sort', plan, params)
+        else:
+            plan = queryset.explain()
+            self.assertNotRegex(plan, r'\bSCAN tasks_task\b', params)
+            if 'status__in' not in params:
+                self.assertNotIn('TEMP B-TREE', plan, params)
+
+    def test_common_combinations_use_an_index(self):
+        for params in (
+            {},
+            {'ordering': '-created_at'},
+            {'status': 'New'},
+            {'status': 'New', 'ordering': '-updated_at'},
+            {'updated_at__gte': self.week_ago, 'ordering': '-updated_at'},
+            {'status': 'Completed', 'updated_at__lte': self.week_ago, 'ordering': 'updated_at'},
+            {'created_at__gte': self.week_ago, 'created_at__lte': timezone.now().isoformat()},
+            {'status__in': 'New,In Progress', 'ordering': '-updated_at'},
+        ):
+            self.assertIndexBacked(params)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', password='pass1234', first_name='Root')
+        self.user = User.objects.create_user(username='worker', password='pass1234', first_name='W')
+        Task.objects.bulk_create([Task(title=f'Task {i}', user=self.user) for i in range(5)])
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:tasks_task_changelist')
+
+    def test_changelist_pages_by_key_without_offset(self):
+        ids = list(Task.objects.order_by('-id').values_list('id', flat=True))
+        with mock.patch('tasks.admin.TaskAdmin.list_per_page', 2), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual([task.pk for task in response.context['cl'].result_list], ids[:2])
+        sql = [query['sql'] for query in queries if 'tasks_task' in query['sql']]
+        self.assertEqual(sum('COUNT(' in query for query in sql), 1)
+        self.assertFalse(any('OFFSET' in query for query in sql))
+
+        with mock.patch('tasks.admin.TaskAdmin.list_per_page', 2):
+            response = self.client.get(self.url + response.context['cl'].next_page_url)
+            self.assertEqual([task.pk for task in response.context['cl'].result_list], ids[2:4])
+            self.assertContains(response, 'First page')
+            response = self.client.get(self.url, {'after': 'x'})
+        self.assertRedirects(response, f'{self.url}?e=1')
+
+        response = self.client.get(self.url, {'q': 'worker', 'status__exact': 'New'})
+        self.assertEqual(len(response.context['cl'].result_list), 5)
+        response = self.client.get(self.url, {'q': str(ids[0])})
+        self.assertEqual([task.pk for task in response.context['cl'].result_list], ids[:1])
+
+    def test_bulk_actions_run_single_statements(self):
+        ids = list(Task.objects.values_list('id', flat=True))
+        data = {'action': 'set_status_completed', '_selected_action': ids[:3]}
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, data)
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "tasks_task"') for query in queries), 1)
+        self.assertEqual(Task.objects.filter(status='Completed').count(), 3)
+
+        self.client.post(self.url, {'action': 'delete_tasks', '_selected_action': ids[:2]})
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(TaskStat.objects.get(user=self.user, status='Completed').count, 1)
+
+    def test_user_autocomplete_and_forms(self):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'tasks', 'model_name': 'task', 'field_name': 'user', 'term': 'wor',
+        })
+        self.assertEqual([item['text'] for item in response.json()['results']], ['worker'])
+        response = self.client.get(reverse('admin:tasks_task_change', args=[Task.objects.first().pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotContains(response, '<option value="%d">root</option>' % self.admin.pk)
+
+        response = self.client.post(reverse('admin:tasks_user_add'), {
+            'username': 'added', 'first_name': 'Added', 'password1': 'Xy7!long-pass', 'password2': 'Xy7!long-pass',
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertTrue(User.objects.get(username='added').check_password('Xy7!long-pass'))
+        self.assertEqual(self.client.get(reverse('admin:tasks_user_changelist')).status_code, status.HTTP_200_OK)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ThrottleTests(APITestCase):
+    def setUp(self):
+        bucket_store.clear()
+        self.user = User.objects.create_user(username='limited', password='pass1234', first_name='L')
+        self.client.force_authenticate(self.user)
+
+    def test_token_bucket_store(self):
+        clock = FakeClock()
+        store = TokenBucketStore(shards=1, max_keys_per_shard=3, clock=clock)
+        self.assertEqual([store.consume('a', 2, 1 / 30) for _ in range(3)], [0.0, 0.0, 30.0])
+        clock.now += 20
+        self.assertAlmostEqual(store.consume('a', 2, 1 / 30), 10.0)
+        clock.now += 10
+        self.assertEqual(store.consume('a', 2, 1 / 30), 0.0)
+
+        # Buckets that have refilled are dropped; beyond the cap the least recently used one goes.
+        clock.now += 60
+        store.consume('b', 2, 1)
+        self.assertEqual(len(store), 1)
+        for key in 'cde':
+            store.consume(key, 2, 1 / 30)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.consume('b', 2, 1 / 30), 0.0)  # evicted: a full bucket again
+
+    @override_settings(TASKS_THROTTLE_RATES={'tasks_read': '2/min', 'tasks_write': '1/min'})
+    def test_task_reads_and_writes_limited_per_user(self):
+        url = reverse('tasks-list')
+        self.assertEqual([self.client.get(url).status_code for _ in range(2)], [200, 200])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+        self.assertEqual(self.client.post(url, {'title': 'T'}).status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, {'title': 'T'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '60')
+
+        other = User.objects.create_user(username='other_limited', password='pass1234', first_name='O')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    @override_settings(TASKS_THROTTLE_RATES={'tasks_read': '2/min', 'tasks_write': '1/min'})
+    def test_async_views_share_the_task_limits(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        url = reverse('async-tasks-list')
+        self.assertEqual(self.client.get(reverse('tasks-list')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url, headers=headers).status_code, status.HTTP_200_OK)
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertIn('throttled', response.json()['detail'])
+
+        data = {'title': 'T'}
+        response = self.client.post(url, data, format='json', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, data, format='json', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '60')
+
+    @override_settings(TASKS_THROTTLE_RATES={'register': '1/hour', 'token': '5/min', 'token_username': '2/min'})
+    def test_register_and_token_limits(self):
+        self.client.force_authenticate(None)
+        url = reverse('user-register')
+        data = {'username': 'first', 'password': 'Xy7!long-pass', 'first_name': 'F'}
+        self.assertEqual(self.client.post(url, data).status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, {**data, 'username': 'second'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '3600')
+        self.assertEqual(self.client.post(url, data, REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Guessing one account's password from several addresses still hits the per-username limit.
+        url = reverse('token_obtain_pair')
+        data = {'username': 'limited', 'password': 'wrong'}
+        codes = [self.client.post(url, data, REMOTE_ADDR=f'10.0.1.{i}').status_code for i in range(3)]
+        self.assertEqual(codes, [401, 401, 429])
+        response = self.client.post(url, {'username': 'first', 'password': 'Xy7!long-pass'}, REMOTE_ADDR='10.0.1.9')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SchemaTests(APITestCase):
+    def setUp(self):
+        api_schema.schema_cache.clear()
+        self.addCleanup(api_schema.schema_cache.clear)
+        self.build = mock.patch('tasks.schema.build_schema', wraps=api_schema.build_schema).start()
+        self.addCleanup(mock.patch.stopall)
+        self.url = reverse('schema')
+
+    def test_schema_built_once_and_served_compressed_with_etag(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        schema = json.loads(response.content)
+        self.assertIn('/api/tasks/', schema['paths'])
+        self.assertEqual(schema['components']['securitySchemes']['jwtAuth']['scheme'], 'bearer')
+        self.assertEqual(schema['paths']['/api/tasks/']['get']['security'], [{'jwtAuth': []}])
+        self.assertEqual(response['Cache-Control'], api_schema.REVALIDATE)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'openapi: 3', gzip.decompress(response.content))
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.build.call_count, 1)
+
+        # The docs pages load the schema from a fingerprinted URL that may be cached for good.
+        fp = api_schema.fingerprint()
+        for name in ('swagger-ui', 'redoc'):
+            self.assertEqual(self.client.get(reverse(name)).data['schema_url'], f'{self.url}?v={fp}')
+        self.assertEqual(self.client.get(self.url, {'v': fp})['Cache-Control'], api_schema.IMMUTABLE)
+
+    def test_build_step_and_debug_rebuild(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(API_SCHEMA_DIR=directory):
+            out = io.StringIO()
+            call_command('build_schema', stdout=out)
+            self.assertEqual(json.loads(out.getvalue())['fingerprint'], api_schema.fingerprint())
+            self.build.reset_mock()
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.build.call_count, 0)
+
+        api_schema.schema_cache.clear()
+        with override_settings(DEBUG=True), mock.patch('tasks.schema.fingerprint', side_effect=['a', 'a', 'b']):
+            for _ in range(3):
+                self.client.get(self.url)
+        self.assertEqual(self.build.call_count, 2)
+
+
+class FastJSONTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='jsonuser', password='pass1234', first_name='J')
+        self.client.force_authenticate(self.user)
+
+    def test_orjson_renderer_and_parser_match_stdlib(self):
+        from decimal import Decimal
+        from uuid import UUID
+        from django.utils.translation import gettext_lazy
+        from rest_framework.exceptions import ErrorDetail, ParseError
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'text': 'ünïcode \u2028 \u2029 \x00\x1f\x7f "q" \\ </script> 😀',
+            'when': timezone.now(), 'day': timezone.now().date(), 'uuid': UUID(int=7), 'price': Decimal('1.25'),
+            'lazy': gettext_lazy('Not found.'), 'error': [ErrorDetail('bad', code='invalid')],
+            'nested': [{'id': 1, 'ok': True, 'none': None}, (2, 3)], 1: 'int key', 'float': 0.1, 'big': 2 ** 70,
+        }
+        for media_type in (None, 'application/json; indent=4'):
+            self.assertEqual(ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+        for body in (b'{"a": [1, 2.5, "\\u00e9"], "b": null}', '{"t": "é"}'.encode(), b'123456789012345678901234'):
+            self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        for body in (b'{"a": ', b'[NaN]'):
+            with self.assertRaises(ParseError) as expected:
+                JSONParser().parse(io.BytesIO(body))
+            with self.assertRaisesMessage(ParseError, str(expected.exception)):
+                ORJSONParser().parse(io.BytesIO(body))
+
+        Task.objects.bulk_create([Task(title=f'Tâche {i}', user=self.user) for i in range(3)])
+        url = reverse('tasks-list')
+        stdlib = self.client.get(url, {'_': 1}).content
+        with mock.patch.object(TaskViewSet, 'renderer_classes', [ORJSONRenderer]), \
+                mock.patch.object(TaskViewSet, 'parser_classes', [ORJSONParser]):
+            self.assertEqual(self.client.get(url, {'_': 1}).content, stdlib)
+            response = self.client.post(url, {'title': 'Créée'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['title'], 'Créée')
+
+    def test_gzip_above_threshold(self):
+        url = reverse('tasks-list')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        Task.objects.bulk_create([Task(title=f'Task {i}', description='x' * 200, user=self.user) for i in range(10)])
+        task_cache.bump_version(self.user.pk)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['results']), 10)
+        self.assertFalse(self.client.get(url).has_header('Content-Encoding'))
+        # The ETag is weakened for the compressed body and still answers If-None-Match.
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        out = io.StringIO()
+        call_command('bench_json', rows=20, repeat=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertTrue(report['identical_output'])
+        self.assertLess(report['gzip']['bytes'], report['stdlib']['bytes'])
+
+
+class StartupTests(APITestCase):
+    databases = '__all__'  # warmup() connects to every database
+
+    def test_lazy_view_imports_on_first_request(self):
+        from django.urls import URLPattern, path
+        view = LazyView('tasks.schema.CachedSwaggerView', url_name='schema')
+        pattern = path('api/docs/', view, name='swagger-ui')
+        self.assertIsInstance(pattern, URLPattern)
+        self.assertEqual(pattern.lookup_str, 'tasks.schema.CachedSwaggerView')
+        self.assertNotIn('view', vars(view))
+
+        response = view(APIRequestFactory().get('/api/docs/'))
+        response.render()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIs(view.cls, api_schema.CachedSwaggerView)
+        self.assertTrue(view.csrf_exempt)
+
+    def test_warmup_and_startup_profile(self):
+        instrumentation.REQUEST_DURATION.clear()
+        timings = warmup()
+        self.assertEqual(set(timings), {'urls', 'serializers', 'request', 'databases'})
+        self.assertEqual(connection.vendor, 'sqlite')
+        self.assertIsNotNone(connection.connection)
+        # The probe request is not a real request: it is not in /metrics.
+        self.assertEqual(instrumentation.REQUEST_DURATION.render()[2:], [])
+
+        out = io.StringIO()
+        call_command('startup_profile', runs=1, top=5, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['cold']['first_status'], status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('warmup', report['warm'])
+        self.assertNotIn('warmup', report['cold'])
+        self.assertEqual(len(report['imports']['slowest_modules_ms']), 5)
+
+    def test_warmup_survives_failing_steps_and_databases(self):
+        from django.db.utils import OperationalError
+        connections['replica_1'].close()
+        with mock.patch('tasks.startup.call', side_effect=RuntimeError('boom')), \
+                mock.patch.object(connections['replica_1'], 'ensure_connection', side_effect=OperationalError), \
+                self.assertLogs('tasks.startup', 'WARNING') as logs:
+            timings = warmup()
+        self.assertEqual(set(timings), {'urls', 'serializers', 'request', 'databases'})
+        self.assertIn('Warmup step "request" failed', logs.output[0])
+        self.assertIn('database "replica_1"', logs.output[1])
+        self.assertIsNotNone(connections['replica_2'].connection)
+
+
+@override_settings(USER_DELETION={'DEFER_ABOVE': 3, 'BATCH_SIZE': 2, 'STALE_SECONDS': 60})
+class UserDeletionTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='root', password='pass1234', first_name='Root')
+        self.user = User.objects.create_user(username='leaving', password='pass1234', first_name='L')
+        self.other = User.objects.create_user(username='staying', password='pass1234', first_name='S')
+        Task.objects.bulk_create([Task(title=f'Task {i}', user=self.user) for i in range(5)])
+        Task.objects.create(title='Kept', user=self.other)
+        now = timezone.now()
+        ArchivedTask.objects.create(
+            id=10_000, title='Old', status='Completed', user=self.user, created_at=now, updated_at=now, archived_at=now
+        )
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('users-detail', args=[self.user.pk])
+
+    def test_small_account_is_deleted_at_once(self):
+        ArchivedTask.objects.all().delete()
+        Task.objects.filter(id__in=list(Task.objects.filter(user=self.user).values_list('id', flat=True)[:2])).delete()
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(UserDeletion.objects.exists())
+
+    def test_large_account_is_deactivated_and_purged_in_batches(self):
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+        # Deleting again reports the job already queued.
+        self.assertEqual(self.client.delete(self.url).data['id'], response.data['id'])
+
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('process_deletions', '--once', '--progress-every=1', stdout=out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([line['deleted_tasks'] for line in lines], [2, 4, 5, 5, 5])
+        self.assertEqual(lines[-1]['status'], 'done')
+        self.assertEqual(lines[-1]['deleted_archived_tasks'], 1)
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE FROM tasks_task ')]
+        self.assertEqual(len(deletes), 3)  # 2 + 2 + 1 ids, never the whole account
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Kept'])
+        self.assertEqual(TaskTombstone.objects.filter(user_id=self.user.pk).count(), 5)
+        job = UserDeletion.objects.get()
+        self.assertEqual((job.status, job.deleted_tasks, job.batches, job.attempts), ('done', 5, 4, 1))
+
+    def test_interrupted_job_resumes_after_stale_timeout(self):
+        job = schedule_deletion(self.user)
+        self.assertEqual(claim_deletion('w1').pk, job.pk)
+        UserPurger(job).delete_batch('deleted_tasks', Task)  # then the worker dies
+        self.assertIsNone(claim_deletion('w2'))
+
+        UserDeletion.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        job = claim_deletion('w2')
+        self.assertEqual((job.worker, job.attempts, job.deleted_tasks), ('w2', 2, 2))
+        job = UserPurger(job).run()
+        self.assertEqual((job.status, job.deleted_tasks), ('done', 5))
+
+    def test_failed_job_is_recorded_and_retried(self):
+        job = schedule_deletion(self.user)
+        with mock.patch.object(UserPurger, 'finish', side_effect=RuntimeError('boom')):
+            err = io.StringIO()
+            call_command('process_deletions', '--once', stdout=io.StringIO(), stderr=err)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('boom', job.error)
+        self.assertIn('boom', err.getvalue())
+
+        call_command('process_deletions', '--once', '--retry-failed', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.attempts), ('done', '', 2))
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_admin_action_queues_deletions(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin:tasks_user_changelist')
+        actions = self.client.get(url).context['action_form'].fields['action'].choices
+        self.assertEqual([name for name, _ in actions if name], ['schedule_deletions'])
+        response = self.client.post(url, {'action': 'schedule_deletions', '_selected_action': [self.user.pk]})
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(UserDeletion.objects.get().user_id, self.user.pk)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        UserDeletion.objects.bulk_create([UserDeletion(user_id=1000 + i, status='done') for i in range(3)])
+        with mock.patch('tasks.admin.UserDeletionAdmin.list_per_page', 2):
+            response = self.client.get(reverse('admin:tasks_userdeletion_changelist'))
+            self.assertEqual(len(response.context['cl'].result_list), 2)
+            self.assertContains(response, 'Next page')
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+SHARDS = 16
+MAX_KEYS_PER_SHARD = 10000
+
+
+class TokenBucketStore:
+    """
+    Token buckets in a sharded in-process dict: a bucket holds up to ``capacity`` tokens, gains
+    ``refill_rate`` per second and each allowed request takes one. A check is O(1) under one
+    shard's lock. A bucket that has refilled completely carries no state, so it is dropped; the
+    least recently used ones are checked on every call, which keeps idle clients from piling up.
+    """
+
+    def __init__(self, shards=SHARDS, max_keys_per_shard=MAX_KEYS_PER_SHARD, clock=time.monotonic):
+        self.max_keys_per_shard = max_keys_per_shard
+        self.clock = clock
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def consume(self, key, capacity, refill_rate):
+        """0.0 if a token was taken, otherwise the seconds until the next one is available."""
+        now = self.clock()
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            entry = buckets.pop(key, None)  # re-inserted below: dict order is least recently used first
+            tokens = capacity if entry is None else min(capacity, entry[0] + (now - entry[1]) * refill_rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+            if not wait:
+                tokens -= 1
+            buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            self._evict(buckets, now)
+        return wait
+
+    def _evict(self, buckets, now):
+        for _ in range(2):
+            oldest = next(iter(buckets))
+            if buckets[oldest][2] > now and len(buckets) <= self.max_keys_per_shard:
+                break
+            del buckets[oldest]
+
+    def clear(self):
+        for buckets, lock in self._shards:
+            with lock:
+                buckets.clear()
+
+    def __len__(self):
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+
+bucket_store = TokenBucketStore()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle semantics ("100/min" per scope from TASKS_THROTTLE_RATES, a cache key per
+    client) on a token bucket instead of a cached request history: bursts up to the rate are
+    allowed, and wait() is the exact time until the next token, which DRF sends as Retry-After.
+    """
+    store = bucket_store
+
+    def get_rate(self):
+        # Read per request (not at import) so override_settings applies; no rate disables the scope.
+        return settings.TASKS_THROTTLE_RATES.get(self.scope) or None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.wait_seconds = self.store.consume(self.key, self.num_requests, self.num_requests / self.duration)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserScopedThrottle(TokenBucketThrottle):
+    """Per authenticated user (per address for anonymous requests)."""
+
+    def get_cache_key(self, request, view):
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class TaskReadThrottle(UserScopedThrottle):
+    scope = 'tasks_read'
+
+    def allow_request(self, request, view):
+        return request.method not in ('GET', 'HEAD', 'OPTIONS') or super().allow_request(request, view)
+
+
+class TaskWriteThrottle(UserScopedThrottle):
+    scope = 'tasks_write'
+
+    def allow_request(self, request, view):
+        return request.method in ('GET', 'HEAD', 'OPTIONS') or super().allow_request(request, view)
+
+
+class AddressThrottle(TokenBucketThrottle):
+    """Per client address (REMOTE_ADDR, or X-Forwarded-For behind NUM_PROXIES proxies)."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class RegisterThrottle(AddressThrottle):
+    scope = 'register'
+
+
+class TokenThrottle(AddressThrottle):
+    scope = 'token'
+
+
+class TokenRefreshThrottle(AddressThrottle):
+    scope = 'token_refresh'
+
+
+class TokenUsernameThrottle(TokenBucketThrottle):
+    """Sign-in attempts per username, whatever address they come from (password guessing)."""
+    scope = 'token_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': username}
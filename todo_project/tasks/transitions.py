@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections, router
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .cache import invalidate_user_tasks
+from .models import Task
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+MAX_TASK_ID = 2 ** 63 - 1  # BigAutoField
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The task has been modified since the given ETag.'
+    default_code = 'precondition_failed'
+
+
+class TransitionNotAllowed(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'transition_not_allowed'
+
+
+def task_id(pk):
+    """A task id from the URL as an int; 404 for anything that cannot be one, before it reaches a query."""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        raise Http404
+    if not 0 < pk <= MAX_TASK_ID:
+        raise Http404
+    return pk
+
+
+def task_etag(pk, updated_at):
+    """Strong validator of a single task: its id and updated_at in microseconds."""
+    if isinstance(updated_at, str):
+        updated_at = parse_datetime(updated_at)
+    return f'"{pk}.{(updated_at - EPOCH) // MICROSECOND}"'
+
+
+class Precondition:
+    """Parsed ``If-Match`` header for one task; ``updated_at`` is None for ``*``."""
+
+    def __init__(self, updated_at=None):
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_request(cls, request, pk):
+        header = request.headers.get('If-Match')
+        if not header:
+            return None
+        etags = parse_etags(header)
+        if etags == ['*']:
+            return cls()
+        for etag in etags:
+            # W/ only means the response was gzip-compressed; the tag still names one version of the task.
+            task_pk, _, micros = etag.removeprefix('W/').strip('"').partition('.')
+            if task_pk == str(pk) and micros.lstrip('-').isdigit():
+                return cls(EPOCH + int(micros) * MICROSECOND)
+        # None of the tags can belong to this task.
+        raise PreconditionFailed()
+
+    def check(self, updated_at):
+        if self.updated_at is not None and self.updated_at != updated_at:
+            raise PreconditionFailed()
+
+
+def transition_task(request, pk, target, sources=None):
+    """
+    Move the requesting user's task ``pk`` to ``target`` with one conditional statement:
+
+        UPDATE tasks_task SET status, updated_at WHERE id AND user_id
+            [AND status IN sources] [AND updated_at = If-Match] RETURNING ...
+
+    The row is only read afterwards if nothing was updated, to tell 404, 412 and 409 apart.
+    ``sources`` defaults to Task.TRANSITIONS[target]; pass all statuses to make it idempotent.
+    """
+    pk = task_id(pk)
+    precondition = Precondition.from_request(request, pk)
+    if sources is None:
+        sources = Task.TRANSITIONS[target]
+
+    using = router.db_for_write(Task)
+    ops = connections[using].ops
+    table = Task._meta.db_table
+    columns = ', '.join(field.column for field in Task._meta.concrete_fields)
+    where = ['id = %s', 'user_id = %s', f"status IN ({', '.join(['%s'] * len(sources))})"]
+    params = [target, ops.adapt_datetimefield_value(timezone.now()), pk, request.user.pk, *sources]
+    if precondition is not None and precondition.updated_at is not None:
+        where.append('updated_at = %s')
+        params.append(ops.adapt_datetimefield_value(precondition.updated_at))
+    sql = f"UPDATE {table} SET status = %s, updated_at = %s WHERE {' AND '.join(where)} RETURNING {columns}"
+
+    task = next(iter(Task.objects.raw(sql, params, using=using)), None)
+    if task is not None:
+        invalidate_user_tasks(request.user.pk)
+        return task
+
+    current = Task.objects.using(using).filter(pk=pk, user_id=request.user.pk).values('status', 'updated_at').first()
+    if current is None:
+        raise Http404
+    if precondition is not None:
+        precondition.check(current['updated_at'])
+    raise TransitionNotAllowed(f"Cannot change status from '{current['status']}' to '{target}'.")
@@ -1,56 +1,285 @@
-from rest_framework import viewsets, permissions, generics, filters
+from rest_framework import viewsets, permissions, generics, filters, status
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Task
-from .serializers import TaskSerializer, UserSerializer
+from .models import Task, TaskWithArchive
+from .archive import restore_tasks
+from .authentication import TokenClaimsJWTAuthentication
+from .changes import task_changes
+from .deletion import schedule_deletion, should_defer
+from .cache import cached_response, invalidate_user_tasks
+from .filters import DEFAULT_ORDERING, TaskFilter, TaskWithArchiveFilter
+from .export import CSVRenderer, NDJSONRenderer, STREAMS, batched, task_rows
+from .instrumentation import timed
+from .importer import FORMATS as IMPORT_FORMATS, TaskImporter
+from .pagination import TaskPagination
+from .routers import ReplicaReadMixin
+from .readpath import encode_tasks, task_encoder, task_values
+from .search import TaskSearchFilter
+from .stats import task_stats
+from .throttling import RegisterThrottle, TaskReadThrottle, TaskWriteThrottle
+from .serializers import TaskSerializer, UserSerializer, TaskIdsSerializer, TaskTransitionSerializer, BULK_MAX_ITEMS
+from .serializers import UserDeletionSerializer
+from .transitions import MAX_TASK_ID, Precondition, PreconditionFailed, task_etag, task_id, transition_task
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = User.objects.order_by('id')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def destroy(self, request, *args, **kwargs):
+        # A large account is deactivated now and deleted by manage.py process_deletions (tasks.deletion).
+        user = self.get_object()
+        if not should_defer(user):
+            return super().destroy(request, *args, **kwargs)
+        job = schedule_deletion(user)
+        return Response(UserDeletionSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 
 class UserRegisterView(generics.CreateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterThrottle]
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['status']  # точная фильтрация по статусу
+    pagination_class = TaskPagination
+    filter_backends = [DjangoFilterBackend, TaskSearchFilter]
+    throttle_classes = [TaskReadThrottle, TaskWriteThrottle]
 
     def get_queryset(self):
         # Возвращаем задачи только текущего пользователя
-        return Task.objects.filter(user=self.request.user)
+        model = TaskWithArchive if self.include_archived else Task
+        return model.objects.filter(user_id=self.request.user.pk).order_by(*DEFAULT_ORDERING)
+
+    @property
+    def filterset_class(self):
+        return TaskWithArchiveFilter if self.include_archived else TaskFilter
+
+    @property
+    def include_archived(self):
+        # Only the list reads the archive; every other action works on active tasks.
+        return self.action == 'list' and self.request.query_params.get('include_archived') == 'true'
+
+    # Reads skip TaskSerializer: rows come from task_values() and are encoded to the same shape.
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, self.render_list)
+
+    def render_list(self):
+        queryset = task_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        archived = self.include_archived
+        if page is not None:
+            return self.get_paginated_response(encode_tasks(page, archived))
+        return Response(encode_tasks(queryset, archived))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.render_detail, etag_for=lambda data: task_etag(data['id'], data['updated_at'])
+        )
+
+    def render_detail(self):
+        row = get_object_or_404(task_values(self.filter_queryset(self.get_queryset())), pk=self.kwargs['pk'])
+        with timed('serializer'):
+            return Response(task_encoder()(row))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def update(self, request, *args, **kwargs):
-        task = self.get_object()
-        if task.user != request.user:
-            raise PermissionDenied("You can update only your own tasks.")
-        return super().update(request, *args, **kwargs)
+        # get_queryset already limits lookups to the user's own tasks.
+        self.precondition = Precondition.from_request(request, kwargs['pk'])
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = task_etag(response.data['id'], response.data['updated_at'])
+        return response
+
+    def perform_update(self, serializer):
+        if self.precondition is None:
+            serializer.save()
+            return
+        # Optimistic concurrency: write only if the row still has the updated_at the client saw.
+        task = serializer.instance
+        self.precondition.check(task.updated_at)
+        fields = dict(serializer.validated_data, updated_at=timezone.now())
+        if not self.get_queryset().filter(pk=task.pk, updated_at=task.updated_at).update(**fields):
+            raise PreconditionFailed()
+        for field, value in fields.items():
+            setattr(task, field, value)
+        invalidate_user_tasks(task.user_id)
 
     def destroy(self, request, *args, **kwargs):
-        task = self.get_object()
-        if task.user != request.user:
-            raise PermissionDenied("You can delete only your own tasks.")
-        return super().destroy(request, *args, **kwargs)
+        pk = task_id(kwargs['pk'])
+        precondition = Precondition.from_request(request, pk)
+        queryset = self.get_queryset().filter(pk=pk)
+        if precondition is not None and precondition.updated_at is not None:
+            queryset = queryset.filter(updated_at=precondition.updated_at)
+        deleted, _ = queryset.delete()
+        if not deleted:
+            current = self.get_object()  # 404 if the task does not exist
+            if precondition is not None:
+                precondition.check(current.updated_at)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def transition_response(self, task):
+        task.user = self.request.user
+        response = Response(self.get_serializer(task).data)
+        response['ETag'] = task_etag(task.pk, task.updated_at)
+        return response
 
     @action(detail=True, methods=['post'])
     def mark_completed(self, request, pk=None):
-        task = self.get_object()
-        if task.user != request.user:
-            raise PermissionDenied("You can mark only your own tasks.")
-        task.status = 'Completed'
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        statuses = [choice[0] for choice in Task.STATUS_CHOICES]
+        return self.transition_response(transition_task(request, pk, 'Completed', sources=statuses))
+
+    @action(detail=True, methods=['post'])
+    def transition(self, request, pk=None):
+        serializer = TaskTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.transition_response(transition_task(request, pk, serializer.validated_data['status']))
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        pk = task_id(pk)
+        if not restore_tasks(request.user.pk, [pk]):
+            raise Http404
+        task = self.get_queryset().select_related('user').get(pk=pk)
+        response = Response(self.get_serializer(task).data)
+        response['ETag'] = task_etag(task.pk, task.updated_at)
+        return response
+
+    # Bulk operations: one transaction and a constant number of queries per batch
+
+    def _bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [f'Ensure this list has no more than {BULK_MAX_ITEMS} items.']})
+        return items
+
+    def _bulk_ids(self, request):
+        serializer = TaskIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        found = set(self.get_queryset().filter(id__in=ids).values_list('id', flat=True))
+        errors = {index: {'id': ['Not found.']} for index, pk in enumerate(ids) if pk not in found}
+        if errors:
+            raise ValidationError(errors)
+        return ids
+
+    @staticmethod
+    def _item_errors(errors):
+        # Per-item errors keyed by position in the batch (older DRF returns a list).
+        if isinstance(errors, list):
+            return {index: error for index, error in enumerate(errors) if error}
+        return errors
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=self._bulk_items(request), many=True)
+        if not serializer.is_valid():
+            raise ValidationError(self._item_errors(serializer.errors))
+        tasks = [Task(user=request.user, **item) for item in serializer.validated_data]
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(tasks)
+            invalidate_user_tasks(request.user.pk)
+        return Response(self.get_serializer(tasks, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        items = self._bulk_items(request)
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        with transaction.atomic():
+            tasks = self.get_queryset().select_related('user').select_for_update(of=('self',)).in_bulk(
+                # JSON true/false are ints to isinstance(); out-of-range ids overflow the column
+                [pk for pk in ids if type(pk) is int and 0 < pk <= MAX_TASK_ID]
+            )
+            errors, updated, fields, seen = {}, [], set(), set()
+            for index, (pk, item) in enumerate(zip(ids, items)):
+                if type(pk) is not int:
+                    errors[index] = {'id': ['A valid integer is required.']}
+                    continue
+                task = tasks.get(pk)
+                if task is None:
+                    errors[index] = {'id': ['Not found.']}
+                    continue
+                if pk in seen:
+                    errors[index] = {'id': ['Duplicate id in this batch.']}
+                    continue
+                seen.add(pk)
+                serializer = self.get_serializer(task, data=item, partial=True)
+                if not serializer.is_valid():
+                    errors[index] = serializer.errors
+                    continue
+                for field, value in serializer.validated_data.items():
+                    setattr(task, field, value)
+                    fields.add(field)
+                updated.append(task)
+            if errors:
+                raise ValidationError(errors)
+            now = timezone.now()
+            for task in updated:
+                task.updated_at = now
+            Task.objects.bulk_update(updated, [*fields, 'updated_at'])
+            invalidate_user_tasks(request.user.pk)
+        return Response(self.get_serializer(updated, many=True).data)
+
+    def bulk_destroy(self, request):
+        with transaction.atomic():
+            ids = self._bulk_ids(request)
+            self.get_queryset().filter(id__in=ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='bulk/mark_completed')
+    def bulk_mark_completed(self, request):
+        with transaction.atomic():
+            ids = self._bulk_ids(request)
+            self.get_queryset().filter(id__in=ids).update(status='Completed', updated_at=timezone.now())
+            invalidate_user_tasks(request.user.pk)
+        tasks = self.get_queryset().filter(id__in=ids).select_related('user').order_by('id')
+        return Response(self.get_serializer(tasks, many=True).data)
+
+    # Both only need the user's id: on GET it comes from the token claims, without a user lookup.
+    @action(detail=False, methods=['get'], authentication_classes=[TokenClaimsJWTAuthentication])
+    def stats(self, request):
+        return Response(task_stats(request.user.pk))
+
+    @action(detail=False, methods=['get'], authentication_classes=[TokenClaimsJWTAuthentication])
+    def changes(self, request):
+        return Response(task_changes(request.user.pk, request.query_params.get('since')))
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        stream, content_type = STREAMS[request.accepted_renderer.format]
+        rows = task_rows(self.filter_queryset(self.get_queryset()), request.user.username)
+        response = StreamingHttpResponse(batched(stream(rows)), content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="tasks.{request.accepted_renderer.format}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_tasks(self, request):
+        # The body is read line by line straight from the WSGI/ASGI stream instead of request.data,
+        # so uploads of any size are never held in memory.
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type not in IMPORT_FORMATS:
+            raise UnsupportedMediaType(content_type)
+        importer = TaskImporter(request.user)
+        report = importer.run(importer.decode(request._request), IMPORT_FORMATS[content_type])
+        return Response(report)
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
 
 application = get_asgi_application()
+
+# Pay the first request's one-off costs before the server starts sending traffic to this worker.
+if settings.STARTUP_WARMUP:
+    from tasks.startup import warmup_in_thread
+    warmup_in_thread()
@@ -1,5 +1,8 @@
 import os
 from pathlib import Path
+
+import django
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Base directory of the project
@@ -20,17 +23,76 @@ DEBUG = os.getenv('DEBUG', 'False').lower() in ('true', '1', 't')
 ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')]
 
 # Database settings
-DATABASES = {
-    'default': {
+# Connections are closed after each request unless DB_CONN_MAX_AGE opts in to persistent ones (checked
+# before reuse; keep it 0 under ASGI, where each request thread opens its own); with DB_POOL=True
+# a psycopg 3 connection pool is used instead (requires psycopg[pool]).
+DB_POOL = os.getenv('DB_POOL', 'False').lower() in ('true', '1', 't')
+
+
+def check_pool_support():
+    # OPTIONS['pool'] needs Django 5.1+ and psycopg 3 with psycopg_pool; psycopg2 would silently ignore it.
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_POOL=True needs Django 5.1 or later.')
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            'DB_POOL=True needs psycopg 3 and its pool: pip install "psycopg[binary,pool]" (in place of psycopg2-binary).'
+        )
+
+
+def database(host, port):
+    config = {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.getenv('DB_NAME', 'todo_db'),
         'USER': os.getenv('DB_USER', 'todo_user'),
         'PASSWORD': os.getenv('DB_PASSWORD', 'todo_pass'),
-        'HOST': os.getenv('DB_HOST', 'localhost'),  # 'db' for Docker, 'localhost' for local dev
-        'PORT': os.getenv('DB_PORT', '5432'),
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 't'),
+    }
+    if DB_POOL:
+        check_pool_support()
+        config['CONN_MAX_AGE'] = 0  # the pool keeps the connections
+        config['OPTIONS'] = {'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        }}
+    return config
+
+
+DATABASES = {
+    # DB_HOST: 'db' for Docker, 'localhost' for local dev
+    'default': database(os.getenv('DB_HOST', 'localhost'), os.getenv('DB_PORT', '5432')),
+}
+
+# Read replicas (comma separated host[:port] in DB_REPLICA_HOSTS), used by tasks.routers for
+# TaskViewSet/UserViewSet reads. A user's reads stay on the primary for DATABASE_REPLICA_PIN_SECONDS
+# after they write, so they always see their own changes.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = dict(
+        database(replica_host, replica_port or os.getenv('DB_PORT', '5432')), TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['tasks.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '10'))
+
+# Cache (local memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached
+# when running several workers so that cache invalidation is shared between them)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'todo-cache'),
     }
 }
 
+# Seconds a cached task list/detail payload is kept (entries are also invalidated on every write)
+TASKS_RESPONSE_CACHE_TIMEOUT = int(os.getenv('TASKS_RESPONSE_CACHE_TIMEOUT', '300'))
+
 # Installed Django apps
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -47,7 +109,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.instrumentation.RequestMetricsMiddleware',  # outermost, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
+    'tasks.compression.ThresholdGZipMiddleware',  # before anything else that reads the response body
     'django.contrib.sessions.middleware.SessionMiddleware',
     # 'corsheaders.middleware.CorsMiddleware',  # Uncomment if CORS needed
 
@@ -77,6 +141,62 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'todo_project.wsgi.application'
 
+# Password hashing and checks run on a pool of WORKERS threads (tasks.hashing). Up to MAX_QUEUE more
+# may wait; beyond that, registration and sign-in answer 503 with Retry-After: RETRY_AFTER seconds.
+PASSWORD_HASHING = {
+    'WORKERS': int(os.getenv('PASSWORD_HASHING_WORKERS', str(os.cpu_count() or 2))),
+    'MAX_QUEUE': int(os.getenv('PASSWORD_HASHING_MAX_QUEUE', str(2 * (os.cpu_count() or 2)))),
+    'RETRY_AFTER': int(os.getenv('PASSWORD_HASHING_RETRY_AFTER', '1')),
+}
+
+AUTHENTICATION_BACKENDS = ['tasks.hashing.PooledModelBackend']
+
+# Default age (days since the last update) at which manage.py archive_tasks moves Completed tasks to the archive.
+TASKS_ARCHIVE_AFTER_DAYS = int(os.getenv('TASKS_ARCHIVE_AFTER_DAYS', '365'))
+
+# Tombstones of deleted tasks are kept this long (manage.py compact_tombstones); a changes-feed cursor
+# older than that gets 410 Gone and the client syncs from scratch.
+TASKS_TOMBSTONE_RETENTION_DAYS = int(os.getenv('TASKS_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# DELETE /api/users/<id>/ of a user with more than DEFER_ABOVE tasks (or any archived ones) deactivates
+# the user and returns 202; manage.py process_deletions then deletes the tasks BATCH_SIZE rows per
+# transaction. A running job without progress for STALE_SECONDS is taken over by another worker.
+USER_DELETION = {
+    'DEFER_ABOVE': int(os.getenv('USER_DELETION_DEFER_ABOVE', '1000')),
+    'BATCH_SIZE': int(os.getenv('USER_DELETION_BATCH_SIZE', '1000')),
+    'STALE_SECONDS': int(os.getenv('USER_DELETION_STALE_SECONDS', '300')),
+}
+
+# Server-Sent Events at /api/tasks/events/ (ASGI only). BACKEND carries change notifications to the
+# streams (tasks.events.LocalBackend: this process only); idle streams get a comment every
+# HEARTBEAT_SECONDS, and a user may hold MAX_CONNECTIONS_PER_USER streams per process.
+TASK_EVENTS = {
+    'BACKEND': os.getenv('TASK_EVENTS_BACKEND', 'tasks.events.LocalBackend'),
+    'HEARTBEAT_SECONDS': float(os.getenv('TASK_EVENTS_HEARTBEAT_SECONDS', '15')),
+    'MAX_CONNECTIONS_PER_USER': int(os.getenv('TASK_EVENTS_MAX_CONNECTIONS_PER_USER', '5')),
+}
+
+# Token-bucket rate limits (tasks.throttling), "<requests>/<second|minute|hour|day>" per scope: a client may
+# burst up to <requests> and then gets one more every period/<requests>, with 429 and Retry-After beyond that.
+# Task reads and writes count per user; registration and token refresh per client address; sign-in both per
+# address and per username. Buckets live in each worker process. An empty value disables the scope.
+TASKS_THROTTLE_RATES = {
+    'tasks_read': os.getenv('THROTTLE_TASKS_READ', '600/min'),
+    'tasks_write': os.getenv('THROTTLE_TASKS_WRITE', '120/min'),
+    'register': os.getenv('THROTTLE_REGISTER', '10/hour'),
+    'token': os.getenv('THROTTLE_TOKEN', '30/min'),
+    'token_username': os.getenv('THROTTLE_TOKEN_USERNAME', '10/min'),
+    'token_refresh': os.getenv('THROTTLE_TOKEN_REFRESH', '60/min'),
+}
+
+# manage.py build_schema writes the rendered OpenAPI schema here (openapi-<fingerprint>.json/.yaml); /api/schema/
+# serves those files when they match the code, and otherwise generates the schema once per process.
+API_SCHEMA_DIR = Path(os.getenv('API_SCHEMA_DIR', BASE_DIR / 'schema_cache'))
+
+# wsgi.py/asgi.py call tasks.startup.warmup() before serving: URL patterns, serializers, one internal request
+# and the database connections are ready before the first real request (manage.py startup_profile measures it).
+STARTUP_WARMUP = os.getenv('STARTUP_WARMUP', 'True').lower() in ('true', '1', 't')
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',},
@@ -95,19 +215,56 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'tasks.User'
 
+# FAST_JSON renders and parses JSON with orjson (tasks.renderers; pip install orjson), with the same output
+# as DRF's JSONRenderer. Responses of at least GZIP_MIN_LENGTH bytes are gzip-compressed for clients that accept it.
+FAST_JSON = os.getenv('FAST_JSON', 'False').lower() in ('true', '1', 't')
+GZIP_MIN_LENGTH = int(os.getenv('GZIP_MIN_LENGTH', '1024'))
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'tasks.renderers.ORJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'tasks.renderers.ORJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_SCHEMA_CLASS': 'tasks.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+SIMPLE_JWT = {
+    # Adds a "username" claim used by tasks.authentication.TokenClaimsJWTAuthentication
+    'TOKEN_OBTAIN_SERIALIZER': 'tasks.serializers.TokenObtainPairWithUsernameSerializer',
+}
+
+# In-process cache of authenticated users (tasks.authentication.CachedJWTAuthentication).
+# SHARED also keeps entries in the Django cache so invalidation reaches every worker.
+JWT_USER_CACHE = {
+    'MAX_SIZE': int(os.getenv('JWT_USER_CACHE_MAX_SIZE', '1024')),
+    'TTL': int(os.getenv('JWT_USER_CACHE_TTL', '60')),
+    'SHARED': os.getenv('JWT_USER_CACHE_SHARED', 'False').lower() in ('true', '1', 't'),
+}
+
+# Request instrumentation (tasks.instrumentation): share of requests that get the query/serializer/auth
+# breakdown and a Server-Timing header, the slow-request log threshold, and the bearer token a scraper
+# sends to /metrics (otherwise only staff with an admin session may read it).
+REQUEST_METRICS = {
+    'SAMPLE_RATE': float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '1.0')),
+    'SLOW_REQUEST_MS': int(os.getenv('REQUEST_METRICS_SLOW_MS', '500')),
+    'SERVER_TIMING': os.getenv('REQUEST_METRICS_SERVER_TIMING', 'True').lower() in ('true', '1', 't'),
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
+
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
@@ -127,6 +284,10 @@ LOGGING = {
         'console': {'class': 'logging.StreamHandler', 'formatter': 'verbose'},
     },
     'root': {'handlers': ['console'], 'level': 'INFO'},
+    'loggers': {
+        # Slow requests, with extra={'request_metrics': {...}} for structured handlers
+        'tasks.requests': {'level': 'WARNING'},
+    },
 }
 
 # CORS settings (uncomment if needed)
@@ -0,0 +1,20 @@
+# Settings for running the test suite without PostgreSQL:
+#   python manage.py test --settings=todo_project.settings_test
+import os
+
+os.environ.setdefault('SECRET_KEY', 'insecure-test-only-secret-key-used-for-signing-test-tokens')
+
+from .settings import *  # noqa: E402,F401,F403
+
+# In-memory SQLite; replica_1/replica_2 are separate databases standing in for read replicas.
+# Routing to them is switched on per test with override_settings(DATABASE_REPLICAS=[...]).
+DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    'replica_1': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    'replica_2': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+}
+DATABASE_REPLICAS = []
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+SECURE_SSL_REDIRECT = False
+# Rate limits are off; ThrottleTests switch them on with override_settings.
+TASKS_THROTTLE_RATES = {}
@@ -5,15 +5,16 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
 from tasks.views import TaskViewSet, UserViewSet, UserRegisterView
+from tasks.instrumentation import metrics_view
+from tasks.throttling import TokenRefreshThrottle, TokenThrottle, TokenUsernameThrottle
+from tasks.async_views import (
+    AsyncTaskListView, AsyncTaskDetailView, AsyncTaskMarkCompletedView, TaskEventStreamView,
+)
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from tasks.startup import LazyView
 
 router = routers.DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='tasks')
@@ -21,11 +22,19 @@ router.register(r'users', UserViewSet, basename='users')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/tasks/events/', TaskEventStreamView.as_view(), name='tasks-events'),
     path('api/', include(router.urls)),
+    path('api/async/tasks/', AsyncTaskListView.as_view(), name='async-tasks-list'),
+    path('api/async/tasks/<int:pk>/', AsyncTaskDetailView.as_view(), name='async-tasks-detail'),
+    path('api/async/tasks/<int:pk>/mark_completed/', AsyncTaskMarkCompletedView.as_view(),
+         name='async-tasks-mark-completed'),
     path('api/register/', UserRegisterView.as_view(), name='user-register'),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/token/', TokenObtainPairView.as_view(throttle_classes=[TokenThrottle, TokenUsernameThrottle]),
+         name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshView.as_view(throttle_classes=[TokenRefreshThrottle]), name='token_refresh'),
+    path('metrics', metrics_view, name='metrics'),
+    # drf-spectacular (and its schema generator) is imported on the first docs request, not at start-up.
+    path('api/schema/', LazyView('tasks.schema.CachedSchemaView'), name='schema'),
+    path('api/docs/', LazyView('tasks.schema.CachedSwaggerView', url_name='schema'), name='swagger-ui'),
+    path('api/redoc/', LazyView('tasks.schema.CachedRedocView', url_name='schema'), name='redoc'),
 ]
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
 
 application = get_wsgi_application()
+
+# Pay the first request's one-off costs before the server starts sending traffic to this worker.
+# With gunicorn --preload, call tasks.startup.warmup() from a post_fork hook instead.
+if settings.STARTUP_WARMUP:
+    from tasks.startup import warmup
+    warmup()